@@ -0,0 +1,171 @@
+import gzip
+from typing import Any
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.http_cache import (
+    CACHE_HEADER,
+    RESPONSE_VERSION_SCOPE_KEY,
+    current_versions,
+    is_cacheable_request,
+    is_stale_response,
+)
+from app.core.config import get_settings
+from app.services.cache import get_cached, make_cache_key, set_cached
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip always works
+    brotli = None
+
+# Compressed bodies of cacheable GETs are kept in the result cache under the
+# response version (processed data plus geometry inputs, as in the ETag), so a
+# hot response is serialized and compressed once and later requests for the
+# same URL and encoding are answered from the stored bytes.
+
+CACHE_NAMESPACE = "http_body"
+
+
+def _accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    if not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    settings = get_settings()
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Negotiate br/gzip for responses above a size threshold."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+
+            async def send_with_vary(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        cache_key = None
+        if is_cacheable_request(scope):
+            version = scope.get(RESPONSE_VERSION_SCOPE_KEY) or (await current_versions())["response_version"]
+            cache_key = make_cache_key(
+                CACHE_NAMESPACE,
+                version,
+                {
+                    "path": scope["path"],
+                    "query": sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)),
+                    "encoding": encoding,
+                },
+            )
+            stored = get_cached(cache_key)
+            if stored is not None:
+                await _send_stored(send, stored)
+                return
+
+        responder = _CompressingResponder(send, encoding, cache_key)
+        await self.app(scope, receive, responder.send)
+
+
+async def _send_stored(send: Send, stored: dict[str, Any]) -> None:
+    headers = list(stored["headers"]) + [(CACHE_HEADER.encode("latin-1"), b"hit")]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": stored["body"]})
+
+
+class _CompressingResponder:
+    """Buffer one response, compress it if large enough, optionally store it."""
+
+    def __init__(self, send: Send, encoding: str, cache_key: str | None) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.cache_key = cache_key
+        self.start: Message | None = None
+        self.chunks: list[bytes] = []
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or message["status"] < 200 or message["status"] in (204, 304):
+                self.passthrough = True
+                await self._send(message)
+                return
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        self.chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        await self._finish()
+
+    async def _finish(self) -> None:
+        assert self.start is not None
+        body = b"".join(self.chunks)
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers.add_vary_header("Accept-Encoding")
+
+        if len(body) < get_settings().compression_min_size:
+            headers["content-length"] = str(len(body))
+            await self._send({**self.start, "headers": headers.raw})
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        body = compress(body, self.encoding)
+        headers["content-encoding"] = self.encoding
+        headers["content-length"] = str(len(body))
+        if self.cache_key is not None and self.start["status"] == 200 and not is_stale_response(headers):
+            set_cached(self.cache_key, {"headers": tuple(headers.raw), "body": body})
+        await self._send({**self.start, "headers": headers.raw})
+        await self._send({"type": "http.response.body", "body": body})
@@ -0,0 +1,166 @@
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.profiling import PROFILE_SCOPE_KEY
+from app.core.config import get_settings
+from app.data.version import get_data_manifest, get_input_manifest, version_from_manifest
+
+# Every GET under /api is a pure function of its query string, the processed
+# data, the geometry files (map and boundaries) and the running code, so one
+# validator per (app version, response version) covers them all. Requests that
+# write files (export=true) and the admin routes always run, as do profiled
+# requests. The versions are reused for http_cache_version_ttl_ms and
+# re-checked in a worker thread, so stat/hash work never blocks the event loop.
+
+EXCLUDED_PREFIXES = ("/api/admin",)
+TRUTHY = {"1", "true", "yes", "on"}
+# Cache outcome reported to clients and the access log ("hit" or "stale").
+# Stale responses are built from a previous data version's result (served
+# while the current one is recomputed); they must not be tagged or stored as
+# current.
+CACHE_HEADER = "x-cache"
+STALE_VALUE = "stale"
+# The data version a request was validated against, for the access log.
+DATA_VERSION_SCOPE_KEY = "pkh.data_version"
+# Processed data plus geometry inputs: what the ETag is built from.
+RESPONSE_VERSION_SCOPE_KEY = "pkh.response_version"
+
+_VERSIONS_LOCK = threading.Lock()
+_VERSIONS: tuple[float, dict[str, Any]] | None = None
+
+
+def _load_versions() -> dict[str, Any]:
+    data = get_data_manifest()
+    inputs = get_input_manifest()
+    return {
+        "data_version": version_from_manifest(data),
+        "response_version": version_from_manifest({"files": {**data["files"], **inputs["files"]}}),
+        "last_modified": int(max(data["last_modified"], inputs["last_modified"])),
+    }
+
+
+def _fresh_versions(ttl: float) -> dict[str, Any] | None:
+    state = _VERSIONS
+    if state is not None and time.monotonic() - state[0] < ttl:
+        return state[1]
+    return None
+
+
+def _refresh_versions(ttl: float) -> dict[str, Any]:
+    global _VERSIONS
+    with _VERSIONS_LOCK:
+        versions = _fresh_versions(ttl)
+        if versions is None:
+            versions = _load_versions()
+            _VERSIONS = (time.monotonic(), versions)
+        return versions
+
+
+async def current_versions() -> dict[str, Any]:
+    """data_version, response_version and last_modified, at most http_cache_version_ttl_ms old."""
+    ttl = get_settings().http_cache_version_ttl_ms / 1000
+    versions = _fresh_versions(ttl)
+    if versions is None:
+        versions = await anyio.to_thread.run_sync(_refresh_versions, ttl)
+    return versions
+
+
+def mark_stale(response: Response) -> None:
+    response.headers[CACHE_HEADER] = STALE_VALUE
+    response.headers["cache-control"] = "no-store"
+
+
+def is_stale_response(headers: Headers) -> bool:
+    return headers.get(CACHE_HEADER) == STALE_VALUE
+
+
+def is_cacheable_request(scope: Scope) -> bool:
+    if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+        return False
+    if scope.get(PROFILE_SCOPE_KEY):
+        return False
+    path: str = scope["path"]
+    if not path.startswith("/api/") and path != "/api":
+        return False
+    if path.startswith(EXCLUDED_PREFIXES):
+        return False
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return not any(value.lower() in TRUTHY for value in query.get("export", []))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: int) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.timestamp() >= last_modified
+
+
+class ConditionalGetMiddleware:
+    """Add response-version ETag/Last-Modified/Cache-Control and answer 304s early."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not is_cacheable_request(scope):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        versions = await current_versions()
+        scope[DATA_VERSION_SCOPE_KEY] = versions["data_version"]
+        scope[RESPONSE_VERSION_SCOPE_KEY] = versions["response_version"]
+        etag = f'W/"{settings.app_version}-{versions["response_version"]}"'
+        last_modified = versions["last_modified"]
+        validators = {
+            "etag": etag,
+            "last-modified": formatdate(last_modified, usegmt=True),
+            "cache-control": settings.http_cache_control,
+        }
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request_headers.get("if-modified-since")
+            not_modified = if_modified_since is not None and _not_modified_since(
+                if_modified_since, last_modified
+            )
+
+        if not_modified:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(key.encode("latin-1"), value.encode("latin-1")) for key, value in validators.items()],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                if not is_stale_response(headers):
+                    for key, value in validators.items():
+                        headers[key] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
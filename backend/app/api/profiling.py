@@ -0,0 +1,262 @@
+import asyncio
+import cProfile
+import functools
+import inspect
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs
+
+import anyio
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.services.cache import bypass_cache
+
+logger = get_logger(__name__)
+
+# Opt-in per-request profiling. A profiled request runs on its own event loop
+# in a separate thread, so the loop-side work (routing, encoding, rendering)
+# recorded for it is not mixed with concurrent requests. Sync endpoints run in
+# a worker thread; routers use ProfiledRoute, which enters the session in
+# whichever thread runs the endpoint, covering its body (get_tables, the
+# analysis function). Cache reads miss for profiled requests (see
+# app.services.cache.bypass_cache), so the profile shows the computation
+# rather than a cache lookup.
+
+PROFILE_HEADER = "x-profile"
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_PATH_HEADER = "x-profile-path"
+PROFILE_SCOPE_KEY = "pkh.profile"
+PROFILE_FORMATS = ("pstats", "speedscope")
+
+_SESSION: ContextVar["ProfileSession | None"] = ContextVar("profile_session", default=None)
+
+
+class ProfileSession:
+    """Profilers (pstats) or sampled threads (speedscope) of one request."""
+
+    def __init__(self, fmt: str) -> None:
+        self.format = fmt
+        self.profiles: list[cProfile.Profile] = []
+        self.threads: set[int] = set()
+        self.lock = threading.Lock()
+
+    def enter_thread(self) -> cProfile.Profile | None:
+        if self.format == "speedscope":
+            with self.lock:
+                self.threads.add(threading.get_ident())
+            return None
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.profiles.append(profiler)
+        profiler.enable()
+        return profiler
+
+    def exit_thread(self, profiler: cProfile.Profile | None) -> None:
+        if profiler is not None:
+            profiler.disable()
+            return
+        with self.lock:
+            self.threads.discard(threading.get_ident())
+
+
+class _StackSampler(threading.Thread):
+    """Samples the call stacks of a session's active threads."""
+
+    def __init__(self, session: ProfileSession, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.session = session
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.frames: dict[tuple[str, str, int], int] = {}
+        self.samples: list[list[int]] = []
+        self.weights: list[float] = []
+
+    def _frame_index(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            with self.session.lock:
+                threads = list(self.session.threads)
+            current = sys._current_frames()
+            for ident in threads:
+                frame = current.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_index(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.samples.append(stack[::-1])
+                    self.weights.append((now - last) * 1000)
+            last = now
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        frames = [{"name": fn, "file": file, "line": line} for (fn, file, line) in self.frames]
+        total = sum(self.weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "pkh-dashboard",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": self.samples,
+                    "weights": self.weights,
+                }
+            ],
+        }
+
+
+def _in_session(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        session = _SESSION.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        profiler = session.enter_thread()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            session.exit_thread(profiler)
+
+    return run
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose sync endpoint joins the request's profiling session, if any.
+
+    The session is carried into the worker thread by the request's context
+    and entered there for the duration of the call.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _in_session(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def requested_format(scope: Scope) -> str | None:
+    settings = get_settings()
+    if scope["type"] != "http" or not settings.profiling_enabled:
+        return None
+    headers = Headers(scope=scope)
+    value = headers.get(PROFILE_HEADER)
+    if value is None:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        value = (query.get("profile") or [None])[0]
+    if value is None:
+        return None
+    if settings.profiling_token and headers.get(PROFILE_TOKEN_HEADER) != settings.profiling_token:
+        return None
+    value = value.strip().lower()
+    return value if value in PROFILE_FORMATS else "pstats"
+
+
+def _profile_path(scope: Scope, fmt: str) -> Path:
+    directory = Path(get_settings().data_dir_cache) / "profiles"
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+    suffix = "speedscope.json" if fmt == "speedscope" else "pstats"
+    return directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}.{suffix}"
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it and point to the result in a header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        fmt = requested_format(scope)
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+
+        body_messages = []
+        while True:
+            message = await receive()
+            body_messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                break
+
+        scope = {**scope, PROFILE_SCOPE_KEY: True}
+        session = ProfileSession(fmt)
+        sent, elapsed, sampler = await anyio.to_thread.run_sync(self._run_isolated, scope, body_messages, session)
+
+        path = _profile_path(scope, fmt)
+        name = f"{scope['method']} {scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+        if sampler is not None:
+            path.write_text(json.dumps(sampler.speedscope(name)), encoding="utf-8")
+        elif session.profiles:
+            stats = pstats.Stats(session.profiles[0])
+            for profiler in session.profiles[1:]:
+                stats.add(profiler)
+            stats.dump_stats(path)
+        logger.info("Profiled %s in %.1f ms -> %s", name, elapsed * 1000, path)
+
+        for message in sent:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_PATH_HEADER] = str(path)
+            await send(message)
+
+    def _run_isolated(self, scope: Scope, body_messages: list[Message], session: ProfileSession):
+        sent: list[Message] = []
+        sampler = None
+        if session.format == "speedscope":
+            sampler = _StackSampler(session, get_settings().profiling_interval_ms / 1000)
+            sampler.start()
+
+        async def run() -> None:
+            pending = list(body_messages)
+            done = asyncio.Event()
+
+            async def local_receive() -> Message:
+                if pending:
+                    return pending.pop(0)
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def local_send(message: Message) -> None:
+                sent.append(message)
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    done.set()
+
+            _SESSION.set(session)
+            bypass_cache()
+            profiler = session.enter_thread()
+            try:
+                await self.app(scope, local_receive, local_send)
+            finally:
+                session.exit_thread(profiler)
+
+        started = time.perf_counter()
+        try:
+            asyncio.run(run())
+        finally:
+            if sampler is not None:
+                sampler.stop_event.set()
+                sampler.join()
+        return sent, time.perf_counter() - started, sampler
@@ -0,0 +1,84 @@
+import random
+import time
+import uuid
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.http_cache import CACHE_HEADER, DATA_VERSION_SCOPE_KEY, is_cacheable_request
+from app.core.config import get_settings
+from app.core.logging import get_logger, request_id_var
+
+logger = get_logger("app.access")
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+def _sample_rate(path: str) -> float:
+    settings = get_settings()
+    rate = settings.log_access_sample_rate
+    best = ""
+    for prefix, prefix_rate in settings.log_access_sample_rates.items():
+        if path.startswith(prefix) and len(prefix) > len(best):
+            best, rate = prefix, prefix_rate
+    return rate
+
+
+def _cache_outcome(scope: Scope, status: int, headers: Headers) -> str:
+    if not is_cacheable_request(scope):
+        return "bypass"
+    if status == 304:
+        return "not_modified"
+    return headers.get(CACHE_HEADER, "miss")
+
+
+class RequestLogMiddleware:
+    """Assign a request ID and emit one sampled JSON access line per request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = 500
+        cache = "miss"
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status, cache
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers[REQUEST_ID_HEADER] = request_id
+                cache = _cache_outcome(scope, status, headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            settings = get_settings()
+            always = status >= 500 or duration_ms >= settings.log_slow_request_ms
+            if always or random.random() < _sample_rate(scope["path"]):
+                logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    extra={
+                        "route": scope["path"],
+                        "method": scope["method"],
+                        "params": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                        "status": status,
+                        "duration_ms": round(duration_ms, 2),
+                        "data_version": scope.get(DATA_VERSION_SCOPE_KEY),
+                        "cache": cache,
+                    },
+                )
+            request_id_var.reset(token)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.routes.admin_memory import router as admin_memory_router
 from app.api.routes.admin_upload import router as admin_upload_router
 from app.api.routes.compare import router as compare_router
 from app.api.routes.compare_years import router as compare_years_router
@@ -12,6 +13,7 @@ from app.api.routes.predict import router as predict_router
 from app.api.routes.regression import router as regression_router
 from app.api.routes.report import router as report_router
 from app.api.routes.scatter import router as scatter_router
+from app.api.routes.spatial import router as spatial_router
 from app.api.routes.summary import router as summary_router
 from app.api.routes.trend import router as trend_router
 
@@ -28,6 +30,8 @@ api_router.include_router(scatter_router, prefix="/scatter", tags=["scatter"])
 api_router.include_router(correlation_router, prefix="/correlation", tags=["correlation"])
 api_router.include_router(regression_router, prefix="/regression", tags=["regression"])
 api_router.include_router(effectiveness_router, prefix="/effectiveness", tags=["effectiveness"])
+api_router.include_router(spatial_router, prefix="/spatial", tags=["spatial"])
 api_router.include_router(report_router, prefix="/report", tags=["report"])
 api_router.include_router(admin_upload_router, prefix="/admin", tags=["admin"])
+api_router.include_router(admin_memory_router, prefix="/admin/memory", tags=["admin"])
 api_router.include_router(predict_router, prefix="/predict", tags=["predict"])
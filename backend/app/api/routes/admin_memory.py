@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import MemoryReportResponse
+from app.api.utils import get_tables
+from app.data.schema import memory_report
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("", response_model=MemoryReportResponse)
+def get_memory_report() -> MemoryReportResponse:
+    report = memory_report(get_tables())
+    return MemoryReportResponse(
+        status="ok",
+        total_bytes=sum(item["bytes"] for item in report),
+        data=report,
+    )
@@ -1,12 +1,30 @@
+import os
+import shutil
 from pathlib import Path
 
+import pandas as pd
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import UploadResponse
 from app.core.config import get_settings
+from app.data.paths import DATASET_FILES, PROCESSED_FILES, resolve_processed_path
 from app.data.transform import build_fact_tables
+from app.data.validate import infer_dataset_key, validate_rows
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _dataset_key(filename: str, path: Path) -> str | None:
+    for key, dataset_filename in DATASET_FILES.items():
+        if dataset_filename.lower() == filename.lower():
+            return key
+    return infer_dataset_key(pd.read_csv(path, nrows=0).columns)
+
+
+def _load_dim_kabupaten() -> pd.DataFrame | None:
+    path = resolve_processed_path(get_settings().data_dir_processed, PROCESSED_FILES["dim_kabupaten"])
+    return pd.read_csv(path) if path.exists() else None
 
 
 @router.post("/upload", response_model=UploadResponse)
@@ -21,11 +39,35 @@ def upload_dataset(
     raw_dir = Path(settings.data_dir_raw)
     raw_dir.mkdir(parents=True, exist_ok=True)
 
+    # The upload is validated before it replaces the raw file, so a rejected
+    # file never reaches the pipeline and no rebuild starts.
     dest = raw_dir / file.filename
-    with dest.open("wb") as buffer:
-        buffer.write(file.file.read())
+    tmp_path = dest.with_name(dest.name + ".upload")
+    with tmp_path.open("wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+    validation = None
+    try:
+        dataset_key = _dataset_key(file.filename, tmp_path)
+        if dataset_key is not None:
+            validation = validate_rows(tmp_path, dataset_key, _load_dim_kabupaten())
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as exc:
+        tmp_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"Could not parse {file.filename}: {exc}") from exc
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if validation is not None and not validation["valid"]:
+        tmp_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"{file.filename} failed validation", "validation": validation},
+        )
+
+    os.replace(tmp_path, dest)
 
     if reprocess:
         build_fact_tables(source_dir=settings.data_dir_raw, output_dir=settings.data_dir_processed)
 
-    return UploadResponse(status="ok", filename=file.filename)
+    return UploadResponse(status="ok", filename=file.filename, validation=validation)
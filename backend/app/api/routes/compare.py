@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import CompareResponse
 from app.api.utils import (
     apply_kabkota_filters,
@@ -10,7 +11,7 @@ from app.api.utils import (
 )
 from app.data.analysis.compare import compute_compare
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=CompareResponse)
@@ -33,6 +34,7 @@ def get_compare(
         df_persen=df_persen,
         df_abs=df_abs,
         year=resolved_year,
+        dim_kabupaten=tables["dim_kabupaten"],
     )
 
     return CompareResponse(status="ok", year=resolved_year, data=data)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import CompareYearsResponse
 from app.api.utils import (
     VALID_METRICS,
@@ -11,7 +12,7 @@ from app.api.utils import (
 )
 from app.data.analysis.compare_years import compute_compare_years
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=CompareYearsResponse)
@@ -37,6 +38,12 @@ def get_compare_years(
         df = apply_kabkota_filters(tables["fact_kemiskinan_persen"], tipe, codes)
         value_column = "persentase_penduduk_miskin"
 
-    data = compute_compare_years(df=df, value_column=value_column, year_a=year_a, year_b=year_b)
+    data = compute_compare_years(
+        df=df,
+        value_column=value_column,
+        year_a=year_a,
+        year_b=year_b,
+        dim_kabupaten=tables["dim_kabupaten"],
+    )
 
     return CompareYearsResponse(status="ok", year_a=year_a, year_b=year_b, metric=metric, data=data)
@@ -1,16 +1,21 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from app.api.schemas import CorrelationResponse
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import CorrelationMatrixResponse, CorrelationResponse
 from app.api.utils import (
     apply_kabkota_filters,
     get_tables,
     normalize_tipe,
     parse_kabkota_codes,
     resolve_year,
+    resolve_year_range,
 )
-from app.data.analysis.correlation import compute_correlation
+from app.data.analysis.correlation import compute_correlation, compute_correlation_matrix
+from app.data.metrics import METRICS
+from app.data.version import get_data_version
+from app.services.cache import get_cached, make_cache_key, set_cached
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=CorrelationResponse)
@@ -31,6 +36,49 @@ def get_correlation(
         df_pkh=df_pkh,
         df_persen=df_persen,
         year=resolved_year,
+        dim_kabupaten=tables["dim_kabupaten"],
     )
 
     return CorrelationResponse(status="ok", year=resolved_year, data=data)
+
+
+@router.get("/matrix", response_model=CorrelationMatrixResponse)
+def get_correlation_matrix(
+    start: int | None = None,
+    end: int | None = None,
+    max_lag: int = 3,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> CorrelationMatrixResponse:
+    resolved_start, resolved_end = resolve_year_range(start, end)
+    if max_lag < 0 or max_lag > 5:
+        raise HTTPException(status_code=400, detail="max_lag must be between 0 and 5")
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+
+    cache_key = make_cache_key(
+        "correlation_matrix",
+        get_data_version(),
+        {"start": resolved_start, "end": resolved_end, "max_lag": max_lag, "tipe": tipe, "kabkota": codes},
+    )
+    data = get_cached(cache_key)
+    if data is None:
+        tables = get_tables()
+        data = compute_correlation_matrix(
+            frames={
+                key: apply_kabkota_filters(tables[spec.table], tipe, codes)
+                for key, spec in METRICS.items()
+            },
+            start=resolved_start,
+            end=resolved_end,
+            max_lag=max_lag,
+        )
+        set_cached(cache_key, data)
+
+    return CorrelationMatrixResponse(
+        status="ok",
+        start=resolved_start,
+        end=resolved_end,
+        max_lag=max_lag,
+        data=data,
+    )
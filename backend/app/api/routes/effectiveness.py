@@ -1,16 +1,25 @@
 from fastapi import APIRouter
 
-from app.api.schemas import EffectivenessResponse
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import EffectivenessResponse, KabkotaEffectivenessResponse
 from app.api.utils import (
     apply_kabkota_filters,
+    get_kabkota_matrix,
     get_tables,
     normalize_tipe,
     parse_kabkota_codes,
     resolve_year_range,
 )
-from app.data.analysis.effectiveness import compute_effectiveness
+from app.data.analysis.effectiveness import (
+    build_effectiveness_panel,
+    compute_effectiveness,
+    compute_kabkota_effectiveness,
+    kabkota_effectiveness_rows,
+)
+from app.data.analysis.kabkota_matrix import kabkota_row_mask
+from app.services.cache import get_or_compute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=EffectivenessResponse)
@@ -33,3 +42,27 @@ def get_effectiveness(
     )
 
     return EffectivenessResponse(status="ok", start=resolved_start, end=resolved_end, data=data)
+
+
+@router.get("/kabkota", response_model=KabkotaEffectivenessResponse)
+def get_kabkota_effectiveness(
+    start: int | None = None,
+    end: int | None = None,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> KabkotaEffectivenessResponse:
+    resolved_start, resolved_end = resolve_year_range(start, end)
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+
+    # The panel covers every kabkota and year; start/end slice its columns and
+    # tipe/kabkota select its rows.
+    panel, _ = get_or_compute(
+        "kabkota_effectiveness",
+        {},
+        lambda: build_effectiveness_panel(get_kabkota_matrix("pkh"), get_kabkota_matrix("kemiskinan")),
+    )
+    effectiveness = compute_kabkota_effectiveness(panel, resolved_start, resolved_end)
+    data = kabkota_effectiveness_rows(effectiveness, kabkota_row_mask(panel, tipe, codes))
+
+    return KabkotaEffectivenessResponse(status="ok", start=resolved_start, end=resolved_end, data=data)
@@ -1,16 +1,29 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from app.api.schemas import InsightsResponse
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import InsightsResponse, RankMoversResponse, TopDeltaResponse
 from app.api.utils import (
+    VALID_METRICS,
     apply_kabkota_filters,
+    get_rank_table,
     get_tables,
     normalize_tipe,
     parse_kabkota_codes,
     resolve_year_range,
+    validate_metric,
 )
+from app.core.config import get_settings
 from app.data.analysis.insights import compute_insights
+from app.data.analysis.kabkota_matrix import kabkota_row_mask
+from app.data.analysis.ranking import compute_rank_movers, compute_top_delta
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _validate_k(k: int) -> int:
+    if k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    return k
 
 
 @router.get("", response_model=InsightsResponse)
@@ -33,6 +46,53 @@ def get_insights(
         df_persen=df_persen,
         start=resolved_start,
         end=resolved_end,
+        dim_kabupaten=tables["dim_kabupaten"],
     )
 
     return InsightsResponse(status="ok", start=resolved_start, end=resolved_end, data=data)
+
+
+@router.get("/rank-movers", response_model=RankMoversResponse)
+def get_rank_movers(
+    metric: str = "kemiskinan",
+    start: int | None = None,
+    end: int | None = None,
+    k: int = 5,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> RankMoversResponse:
+    metric = validate_metric(metric, VALID_METRICS)
+    resolved_start, resolved_end = resolve_year_range(start, end)
+    k = _validate_k(k)
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+    table = get_rank_table(metric)
+
+    data = compute_rank_movers(table, resolved_start, resolved_end, kabkota_row_mask(table, tipe, codes), k)
+
+    return RankMoversResponse(
+        status="ok", metric=metric, start=resolved_start, end=resolved_end, k=k, data=data
+    )
+
+
+@router.get("/top-delta", response_model=TopDeltaResponse)
+def get_top_delta(
+    metric: str = "kemiskinan",
+    year_a: int | None = None,
+    year_b: int | None = None,
+    k: int = 5,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> TopDeltaResponse:
+    settings = get_settings()
+    metric = validate_metric(metric, VALID_METRICS)
+    year_a = year_a or settings.default_start_year
+    year_b = year_b or settings.default_end_year
+    k = _validate_k(k)
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+    table = get_rank_table(metric)
+
+    data = compute_top_delta(table, year_a, year_b, kabkota_row_mask(table, tipe, codes), k)
+
+    return TopDeltaResponse(status="ok", metric=metric, year_a=year_a, year_b=year_b, k=k, data=data)
@@ -1,18 +1,19 @@
 from fastapi import APIRouter
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import KabkotaResponse
 from app.api.utils import (
     VALID_METRICS,
-    apply_kabkota_filters,
-    get_tables,
+    get_rank_table,
     normalize_tipe,
     parse_kabkota_codes,
     resolve_year,
     validate_metric,
 )
-from app.data.analysis.descriptive import compute_kabkota_metric
+from app.data.analysis.kabkota_matrix import kabkota_row_mask
+from app.data.analysis.ranking import ranked_values
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=KabkotaResponse)
@@ -26,18 +27,8 @@ def get_kabkota(
     metric = validate_metric(metric, VALID_METRICS)
     tipe = normalize_tipe(tipe)
     codes = parse_kabkota_codes(kabkota)
-    tables = get_tables()
+    table = get_rank_table(metric)
 
-    df_pkh = apply_kabkota_filters(tables["fact_pkh"], tipe, codes)
-    df_persen = apply_kabkota_filters(tables["fact_kemiskinan_persen"], tipe, codes)
-    df_abs = apply_kabkota_filters(tables["fact_kemiskinan_abs"], tipe, codes)
-
-    data = compute_kabkota_metric(
-        metric=metric,
-        year=resolved_year,
-        df_pkh=df_pkh,
-        df_persen=df_persen,
-        df_abs=df_abs,
-    )
+    data = ranked_values(table, resolved_year, kabkota_row_mask(table, tipe, codes))
 
     return KabkotaResponse(status="ok", year=resolved_year, metric=metric, data=data)
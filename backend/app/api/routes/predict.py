@@ -1,8 +1,10 @@
 from pathlib import Path
 
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
+from app.api.http_cache import mark_stale
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import PredictionComparisonResponse, PredictionResponse
 from app.api.utils import (
     VALID_PREDICT_METHODS,
@@ -13,9 +15,17 @@ from app.api.utils import (
     parse_kabkota_codes,
 )
 from app.core.config import get_settings
-from app.data.analysis.predictive import compare_methods_by_kabkota, forecast_by_kabkota, forecast_by_kabkota_method
+from app.data.analysis.predictive import (
+    DEFAULT_INTERVAL_LEVEL,
+    compare_methods_by_kabkota,
+    forecast_rows_from_frame,
+    forecast_stacked,
+)
+from app.data.forecasts import get_forecast_frames, schedule_forecast_rebuild
+from app.data.metrics import METRICS, stack_metric_frames
+from app.services.cache import get_or_compute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 def _validate_metric(metric: str) -> str:
@@ -34,13 +44,76 @@ def _export_csv(rows: list[dict], filename: str) -> str:
     return str(path)
 
 
+def _clip_bounds(metrics: list[str]) -> dict[str, tuple[float | None, float | None]]:
+    return {name: (METRICS[name].clip_min, METRICS[name].clip_max) for name in metrics}
+
+
+def _predict_from_table(
+    metrics: list[str],
+    method: str,
+    horizon: int,
+    tipe: str,
+    codes: list[int],
+    level: float,
+) -> dict[str, tuple[list[dict], int, int]] | None:
+    """Answer from the precomputed forecast table, or None if it cannot.
+
+    The table is fitted on the unfiltered data, so a filter whose series end
+    before the table's base year needs an on-demand fit instead.
+    """
+    frames = get_forecast_frames()
+    if frames is None:
+        schedule_forecast_rebuild()
+        return None
+
+    results: dict[str, tuple[list[dict], int, int]] = {}
+    for name in metrics:
+        frame = frames.get((name, method))
+        if frame is None:
+            return None
+        frame = apply_kabkota_filters(frame, tipe, codes)
+        if not frame.empty and int(frame["last_observed_year"].max()) != int(frame["tahun"].min()) - 1:
+            return None
+        spec = METRICS[name]
+        results[name] = forecast_rows_from_frame(frame, horizon, spec.clip_min, spec.clip_max, level)
+    return results
+
+
+def _predict_on_demand(
+    metrics: list[str],
+    method: str,
+    horizon: int,
+    tipe: str,
+    codes: list[int],
+    level: float,
+) -> dict[str, tuple[list[dict], int, int]]:
+    tables = get_tables()
+    stacked = stack_metric_frames(
+        {name: apply_kabkota_filters(tables[METRICS[name].table], tipe, codes) for name in metrics}
+    )
+    forecasts = forecast_stacked(
+        stacked,
+        horizon,
+        method,
+        _clip_bounds(metrics),
+        level=level,
+        workers=get_settings().resolved_forecast_workers,
+    )
+    return {
+        name: (result["rows"], result["start_year"], result["end_year"])
+        for name, result in forecasts.items()
+    }
+
+
 @router.get("", response_model=PredictionResponse)
 def get_prediction(
+    response: Response,
     metric: str = "all",
     horizon: int = 5,
     method: str = "auto",
     tipe: str | None = None,
     kabkota: str | None = None,
+    level: float = DEFAULT_INTERVAL_LEVEL,
     export: bool = False,
 ) -> PredictionResponse:
     metric = _validate_metric(metric)
@@ -49,179 +122,42 @@ def get_prediction(
         raise HTTPException(status_code=400, detail=f"Invalid method: {method}")
     if horizon < 1 or horizon > 10:
         raise HTTPException(status_code=400, detail="horizon must be between 1 and 10 years")
+    if level <= 0 or level >= 1:
+        raise HTTPException(status_code=400, detail="level must be between 0 and 1")
 
     tipe = normalize_tipe(tipe)
     codes = parse_kabkota_codes(kabkota)
-    tables = get_tables()
+    metrics = list(METRICS) if metric == "all" else [metric]
+    method_desc = "auto (holt -> linear -> naive)" if method == "auto" else method
 
-    df_pkh = apply_kabkota_filters(tables["fact_pkh"], tipe, codes)
-    df_persen = apply_kabkota_filters(tables["fact_kemiskinan_persen"], tipe, codes)
-    df_abs = apply_kabkota_filters(tables["fact_kemiskinan_abs"], tipe, codes)
+    def compute() -> dict[str, tuple[list[dict], int, int]]:
+        forecasts = _predict_from_table(metrics, method, horizon, tipe, codes, level)
+        if forecasts is None:
+            forecasts = _predict_on_demand(metrics, method, horizon, tipe, codes, level)
+        return forecasts
 
-    method_note = "auto (holt -> linear -> naive)"
-
-    if metric == "pkh":
-        if method == "auto":
-            data, _, start_year, end_year = forecast_by_kabkota(
-                df_pkh,
-                "jumlah_penerima_manfaat",
-                horizon,
-                clip_min=0.0,
-            )
-            method_desc = method_note
-        else:
-            data, start_year, end_year = forecast_by_kabkota_method(
-                df_pkh,
-                "jumlah_penerima_manfaat",
-                horizon,
-                method,
-                clip_min=0.0,
-            )
-            method_desc = method
-        export_path = None
-        if export:
-            export_path = _export_csv(
-                data,
-                f"pred_{metric}_{method}_{start_year}_{end_year}.csv",
-            )
-        return PredictionResponse(
-            status="ok",
-            metric=metric,
-            horizon=horizon,
-            start_year=start_year,
-            end_year=end_year,
-            method=method_desc,
-            export_path=export_path,
-            data=data,
-        )
-
-    if metric == "kemiskinan_abs":
-        if method == "auto":
-            data, _, start_year, end_year = forecast_by_kabkota(
-                df_abs,
-                "jumlah_penduduk_miskin",
-                horizon,
-                clip_min=0.0,
-            )
-            method_desc = method_note
-        else:
-            data, start_year, end_year = forecast_by_kabkota_method(
-                df_abs,
-                "jumlah_penduduk_miskin",
-                horizon,
-                method,
-                clip_min=0.0,
-            )
-            method_desc = method
-        export_path = None
-        if export:
-            export_path = _export_csv(
-                data,
-                f"pred_{metric}_{method}_{start_year}_{end_year}.csv",
-            )
-        return PredictionResponse(
-            status="ok",
-            metric=metric,
-            horizon=horizon,
-            start_year=start_year,
-            end_year=end_year,
-            method=method_desc,
-            export_path=export_path,
-            data=data,
-        )
-
-    if metric == "kemiskinan":
-        if method == "auto":
-            data, _, start_year, end_year = forecast_by_kabkota(
-                df_persen,
-                "persentase_penduduk_miskin",
-                horizon,
-                clip_min=0.0,
-                clip_max=100.0,
-            )
-            method_desc = method_note
-        else:
-            data, start_year, end_year = forecast_by_kabkota_method(
-                df_persen,
-                "persentase_penduduk_miskin",
-                horizon,
-                method,
-                clip_min=0.0,
-                clip_max=100.0,
-            )
-            method_desc = method
-        export_path = None
-        if export:
-            export_path = _export_csv(
-                data,
-                f"pred_{metric}_{method}_{start_year}_{end_year}.csv",
-            )
-        return PredictionResponse(
-            status="ok",
-            metric=metric,
-            horizon=horizon,
-            start_year=start_year,
-            end_year=end_year,
-            method=method_desc,
-            export_path=export_path,
-            data=data,
-        )
+    forecasts, stale = get_or_compute(
+        "predict",
+        {"metric": metric, "method": method, "horizon": horizon, "tipe": tipe, "kabkota": codes, "level": level},
+        compute,
+        stale_while_revalidate=not export,
+    )
+    if stale:
+        mark_stale(response)
 
-    if method == "auto":
-        data_pkh, _, start_year, end_year = forecast_by_kabkota(
-            df_pkh,
-            "jumlah_penerima_manfaat",
-            horizon,
-            clip_min=0.0,
-        )
-        data_abs, _, _, _ = forecast_by_kabkota(
-            df_abs,
-            "jumlah_penduduk_miskin",
-            horizon,
-            clip_min=0.0,
-        )
-        data_persen, _, _, _ = forecast_by_kabkota(
-            df_persen,
-            "persentase_penduduk_miskin",
-            horizon,
-            clip_min=0.0,
-            clip_max=100.0,
-        )
-        method_desc = method_note
+    if metric == "all":
+        data = {name: rows for name, (rows, _, _) in forecasts.items()}
+        _, start_year, end_year = forecasts["pkh"]
+        export_rows = [{**row, "metric": name} for name, rows in data.items() for row in rows]
     else:
-        data_pkh, start_year, end_year = forecast_by_kabkota_method(
-            df_pkh,
-            "jumlah_penerima_manfaat",
-            horizon,
-            method,
-            clip_min=0.0,
-        )
-        data_abs, _, _ = forecast_by_kabkota_method(
-            df_abs,
-            "jumlah_penduduk_miskin",
-            horizon,
-            method,
-            clip_min=0.0,
-        )
-        data_persen, _, _ = forecast_by_kabkota_method(
-            df_persen,
-            "persentase_penduduk_miskin",
-            horizon,
-            method,
-            clip_min=0.0,
-            clip_max=100.0,
-        )
-        method_desc = method
+        data, start_year, end_year = forecasts[metric]
+        export_rows = data
 
     export_path = None
     if export:
         export_path = _export_csv(
-            [
-                {**row, "metric": "pkh"} for row in data_pkh
-            ]
-            + [{**row, "metric": "kemiskinan_abs"} for row in data_abs]
-            + [{**row, "metric": "kemiskinan"} for row in data_persen],
-            f"pred_all_{method}_{start_year}_{end_year}.csv",
+            export_rows,
+            f"pred_{metric}_{method}_{start_year}_{end_year}.csv",
         )
 
     return PredictionResponse(
@@ -231,17 +167,15 @@ def get_prediction(
         start_year=start_year,
         end_year=end_year,
         method=method_desc,
+        level=level,
         export_path=export_path,
-        data={
-            "pkh": data_pkh,
-            "kemiskinan_abs": data_abs,
-            "kemiskinan": data_persen,
-        },
+        data=data,
     )
 
 
 @router.get("/compare", response_model=PredictionComparisonResponse)
 def compare_methods(
+    response: Response,
     metric: str = "kemiskinan",
     test_years: int = 2,
     tipe: str | None = None,
@@ -257,43 +191,30 @@ def compare_methods(
 
     tipe = normalize_tipe(tipe)
     codes = parse_kabkota_codes(kabkota)
-    tables = get_tables()
+    spec = METRICS[metric]
+    methods = ["holt", "holt_fast", "arima", "linear"]
 
-    df_pkh = apply_kabkota_filters(tables["fact_pkh"], tipe, codes)
-    df_persen = apply_kabkota_filters(tables["fact_kemiskinan_persen"], tipe, codes)
-    df_abs = apply_kabkota_filters(tables["fact_kemiskinan_abs"], tipe, codes)
-
-    methods = ["holt", "arima", "linear"]
-
-    if metric == "pkh":
-        result = compare_methods_by_kabkota(
-            df_pkh,
-            "jumlah_penerima_manfaat",
+    def compute() -> dict:
+        tables = get_tables()
+        return compare_methods_by_kabkota(
+            apply_kabkota_filters(tables[spec.table], tipe, codes),
+            spec.value_col,
             test_years,
             methods,
-            clip_min=0.0,
-            include_details=details,
-        )
-    elif metric == "kemiskinan_abs":
-        result = compare_methods_by_kabkota(
-            df_abs,
-            "jumlah_penduduk_miskin",
-            test_years,
-            methods,
-            clip_min=0.0,
-            include_details=details,
-        )
-    else:
-        result = compare_methods_by_kabkota(
-            df_persen,
-            "persentase_penduduk_miskin",
-            test_years,
-            methods,
-            clip_min=0.0,
-            clip_max=100.0,
+            clip_min=spec.clip_min,
+            clip_max=spec.clip_max,
             include_details=details,
         )
 
+    result, stale = get_or_compute(
+        "predict_compare",
+        {"metric": metric, "test_years": test_years, "tipe": tipe, "kabkota": codes, "details": details},
+        compute,
+        stale_while_revalidate=not export,
+    )
+    if stale:
+        mark_stale(response)
+
     export_paths = None
     if export:
         export_paths = {}
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.schemas import RegressionResponse
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import RegressionGridResponse, RegressionResponse
 from app.api.utils import (
     apply_kabkota_filters,
     get_tables,
@@ -8,9 +9,9 @@ from app.api.utils import (
     parse_kabkota_codes,
     resolve_year_range,
 )
-from app.data.analysis.regression import compute_regression
+from app.data.analysis.regression import compute_regression, compute_regression_grid
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=RegressionResponse)
@@ -33,6 +34,33 @@ def get_regression(
         df_persen=df_persen,
         start=resolved_start,
         end=resolved_end,
+        dim_kabupaten=tables["dim_kabupaten"],
     )
 
     return RegressionResponse(status="ok", start=resolved_start, end=resolved_end, data=data)
+
+
+@router.get("/grid", response_model=RegressionGridResponse)
+def get_regression_grid(
+    start: int | None = None,
+    end: int | None = None,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> RegressionGridResponse:
+    resolved_start, resolved_end = resolve_year_range(start, end)
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+    tables = get_tables()
+
+    df_pkh = apply_kabkota_filters(tables["fact_pkh"], tipe, codes)
+    df_persen = apply_kabkota_filters(tables["fact_kemiskinan_persen"], tipe, codes)
+
+    data = compute_regression_grid(
+        df_pkh=df_pkh,
+        df_persen=df_persen,
+        start=resolved_start,
+        end=resolved_end,
+        dim_kabupaten=tables["dim_kabupaten"],
+    )
+
+    return RegressionGridResponse(status="ok", start=resolved_start, end=resolved_end, data=data)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 
+from app.api.profiling import ProfiledRoute
 from app.api.utils import get_tables, resolve_year_range
 from app.services.report_export import build_summary_csv
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/summary")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import ScatterResponse
 from app.api.utils import (
     apply_kabkota_filters,
@@ -10,7 +11,7 @@ from app.api.utils import (
 )
 from app.data.analysis.scatter import compute_scatter
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=ScatterResponse)
@@ -31,6 +32,7 @@ def get_scatter(
         df_pkh=df_pkh,
         df_persen=df_persen,
         year=resolved_year,
+        dim_kabupaten=tables["dim_kabupaten"],
     )
 
     return ScatterResponse(status="ok", year=resolved_year, data=data)
@@ -0,0 +1,82 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException
+
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import LisaResponse, MoranResponse
+from app.api.utils import (
+    VALID_METRICS,
+    get_contiguity_weights,
+    get_kabkota_matrix,
+    normalize_tipe,
+    parse_kabkota_codes,
+    resolve_year,
+    validate_metric,
+)
+from app.data.analysis.kabkota_matrix import kabkota_row_mask, year_block
+from app.data.analysis.spatial import compute_lisa, compute_moran, lisa_records
+from app.data.geometry import align_weights
+from app.services.cache import get_or_compute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _validate_permutations(permutations: int) -> int:
+    if permutations < 1 or permutations > 9999:
+        raise HTTPException(status_code=400, detail="permutations must be between 1 and 9999")
+    return permutations
+
+
+def _inputs(metric: str, year: int) -> tuple[dict, np.ndarray, dict]:
+    matrix = get_kabkota_matrix(metric)
+    values = year_block(matrix, np.array([year]))[:, 0]
+    return matrix, values, get_contiguity_weights()
+
+
+@router.get("/moran", response_model=MoranResponse)
+def get_moran(
+    metric: str = "kemiskinan",
+    year: int | None = None,
+    permutations: int = 999,
+) -> MoranResponse:
+    resolved_year = resolve_year(year)
+    metric = validate_metric(metric, VALID_METRICS)
+    permutations = _validate_permutations(permutations)
+    matrix, values, weights = _inputs(metric, resolved_year)
+
+    data, _ = get_or_compute(
+        "spatial_moran",
+        {"metric": metric, "year": resolved_year, "permutations": permutations, "geometry": weights["version"]},
+        lambda: compute_moran(values, align_weights(weights, matrix["kode_kabupaten_kota"]), permutations),
+    )
+
+    return MoranResponse(status="ok", metric=metric, year=resolved_year, data=data)
+
+
+@router.get("/lisa", response_model=LisaResponse)
+def get_lisa(
+    metric: str = "kemiskinan",
+    year: int | None = None,
+    permutations: int = 999,
+    significance: float = 0.05,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> LisaResponse:
+    resolved_year = resolve_year(year)
+    metric = validate_metric(metric, VALID_METRICS)
+    permutations = _validate_permutations(permutations)
+    if not 0 < significance < 1:
+        raise HTTPException(status_code=400, detail="significance must be between 0 and 1")
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+    matrix, values, weights = _inputs(metric, resolved_year)
+
+    # LISA is computed over every kabkota; tipe/kabkota only select rows and
+    # significance only labels clusters, so neither is part of the cache key.
+    lisa, _ = get_or_compute(
+        "spatial_lisa",
+        {"metric": metric, "year": resolved_year, "permutations": permutations, "geometry": weights["version"]},
+        lambda: compute_lisa(values, align_weights(weights, matrix["kode_kabupaten_kota"]), permutations),
+    )
+    data = lisa_records(matrix, values, lisa, kabkota_row_mask(matrix, tipe, codes), significance)
+
+    return LisaResponse(status="ok", metric=metric, year=resolved_year, significance=significance, data=data)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.profiling import ProfiledRoute
 from app.api.schemas import SummaryResponse
 from app.api.utils import (
     apply_kabkota_filters,
@@ -10,7 +11,7 @@ from app.api.utils import (
 )
 from app.data.analysis.descriptive import compute_summary
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=SummaryResponse)
@@ -1,17 +1,22 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from app.api.schemas import TrendResponse
+from app.api.profiling import ProfiledRoute
+from app.api.schemas import TrendMatrixResponse, TrendResponse
 from app.api.utils import (
+    VALID_METRICS,
     VALID_TREND_METRICS,
     apply_kabkota_filters,
+    get_kabkota_matrix,
     get_tables,
     normalize_tipe,
     parse_kabkota_codes,
+    resolve_year_range,
     validate_metric,
 )
 from app.data.analysis.descriptive import compute_trend
+from app.data.analysis.kabkota_matrix import compute_kabkota_matrix, kabkota_row_mask
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("", response_model=TrendResponse)
@@ -35,3 +40,25 @@ def get_trend(
     )
 
     return TrendResponse(status="ok", metric=metric, data=data)
+
+
+@router.get("/matrix", response_model=TrendMatrixResponse)
+def get_trend_matrix(
+    metric: str = "kemiskinan,pkh,kemiskinan_abs",
+    start: int | None = None,
+    end: int | None = None,
+    tipe: str | None = None,
+    kabkota: str | None = None,
+) -> TrendMatrixResponse:
+    metrics = list(dict.fromkeys(validate_metric(item, VALID_METRICS) for item in metric.split(",") if item.strip()))
+    if not metrics:
+        raise HTTPException(status_code=400, detail="metric must list at least one metric")
+    resolved_start, resolved_end = resolve_year_range(start, end)
+    tipe = normalize_tipe(tipe)
+    codes = parse_kabkota_codes(kabkota)
+
+    matrices = {item: get_kabkota_matrix(item) for item in metrics}
+    row_mask = kabkota_row_mask(next(iter(matrices.values())), tipe, codes)
+    data = compute_kabkota_matrix(matrices, resolved_start, resolved_end, row_mask)
+
+    return TrendMatrixResponse(status="ok", metrics=metrics, start=resolved_start, end=resolved_end, data=data)
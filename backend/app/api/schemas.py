@@ -17,6 +17,13 @@ class TrendResponse(BaseResponse):
     data: Optional[list[dict[str, Any]]] = None
 
 
+class TrendMatrixResponse(BaseResponse):
+    metrics: list[str]
+    start: int
+    end: int
+    data: Optional[dict[str, Any]] = None
+
+
 class KabkotaResponse(BaseResponse):
     year: int
     metric: str
@@ -34,12 +41,25 @@ class CorrelationResponse(BaseResponse):
     data: Optional[dict[str, Any]] = None
 
 
+class CorrelationMatrixResponse(BaseResponse):
+    start: int
+    end: int
+    max_lag: int
+    data: Optional[dict[str, Any]] = None
+
+
 class RegressionResponse(BaseResponse):
     start: int
     end: int
     data: Optional[dict[str, Any]] = None
 
 
+class RegressionGridResponse(BaseResponse):
+    start: int
+    end: int
+    data: Optional[list[dict[str, Any]]] = None
+
+
 class CompareResponse(BaseResponse):
     year: int
     data: Optional[list[dict[str, Any]]] = None
@@ -51,12 +71,47 @@ class EffectivenessResponse(BaseResponse):
     data: Optional[list[dict[str, Any]]] = None
 
 
+class KabkotaEffectivenessResponse(BaseResponse):
+    start: int
+    end: int
+    data: Optional[dict[str, Any]] = None
+
+
 class InsightsResponse(BaseResponse):
     start: int
     end: int
     data: Optional[dict[str, Any]] = None
 
 
+class RankMoversResponse(BaseResponse):
+    metric: str
+    start: int
+    end: int
+    k: int
+    data: Optional[dict[str, Any]] = None
+
+
+class TopDeltaResponse(BaseResponse):
+    metric: str
+    year_a: int
+    year_b: int
+    k: int
+    data: Optional[dict[str, Any]] = None
+
+
+class MoranResponse(BaseResponse):
+    metric: str
+    year: int
+    data: Optional[dict[str, Any]] = None
+
+
+class LisaResponse(BaseResponse):
+    metric: str
+    year: int
+    significance: float
+    data: Optional[list[dict[str, Any]]] = None
+
+
 class ScatterResponse(BaseResponse):
     year: int
     data: Optional[list[dict[str, Any]]] = None
@@ -71,6 +126,12 @@ class CompareYearsResponse(BaseResponse):
 
 class UploadResponse(BaseResponse):
     filename: str
+    validation: Optional[dict[str, Any]] = None
+
+
+class MemoryReportResponse(BaseResponse):
+    total_bytes: int
+    data: Optional[list[dict[str, Any]]] = None
 
 
 class PredictionResponse(BaseResponse):
@@ -79,6 +140,7 @@ class PredictionResponse(BaseResponse):
     start_year: int
     end_year: int
     method: Optional[str] = None
+    level: Optional[float] = None
     export_path: Optional[str] = None
     data: Optional[Any] = None
 
@@ -1,14 +1,21 @@
+from pathlib import Path
 from typing import Iterable
 
 from fastapi import HTTPException
 
 from app.core.config import get_settings
+from app.data.analysis.kabkota_matrix import pivot_kabkota_matrix
+from app.data.analysis.ranking import build_rank_table
+from app.data.geometry import contiguity_weights, load_kabkota_boundaries
+from app.data.metrics import METRICS
 from app.data.transform import ensure_processed_tables
+from app.data.version import get_file_version
+from app.services.cache import get_or_compute
 
 VALID_METRICS = {"kemiskinan", "pkh", "kemiskinan_abs"}
 VALID_TREND_METRICS = {"kemiskinan", "pkh"}
 VALID_PREDICT_METRICS = {"kemiskinan", "pkh", "kemiskinan_abs", "all"}
-VALID_PREDICT_METHODS = {"auto", "holt", "arima", "linear"}
+VALID_PREDICT_METHODS = {"auto", "holt", "holt_fast", "arima", "linear"}
 
 
 def resolve_year(year: int | None) -> int:
@@ -39,6 +46,42 @@ def get_tables():
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+def get_kabkota_matrix(metric: str) -> dict:
+    """The unfiltered kabkota x year pivot of ``metric``, built once per data version."""
+
+    def compute() -> dict:
+        tables = get_tables()
+        spec = METRICS[metric]
+        return pivot_kabkota_matrix(tables[spec.table], spec.value_col, tables["dim_kabupaten"])
+
+    matrix, _ = get_or_compute("kabkota_matrix", {"metric": metric}, compute)
+    return matrix
+
+
+def get_rank_table(metric: str) -> dict:
+    """Per-year ranks of ``metric`` (see build_rank_table), built once per data version."""
+    table, _ = get_or_compute("rank_table", {"metric": metric}, lambda: build_rank_table(get_kabkota_matrix(metric)))
+    return table
+
+
+def get_contiguity_weights() -> dict:
+    """Jawa Barat contiguity weights (see app.data.geometry), built once per geometry version."""
+    settings = get_settings()
+    path = Path(settings.kabkota_boundaries_path)
+    if not path.exists():
+        raise HTTPException(status_code=500, detail=f"Boundaries not found: {path}")
+
+    version = get_file_version(path)
+
+    def compute() -> dict:
+        weights = contiguity_weights(load_kabkota_boundaries(path, settings.prov_code_jabar))
+        weights["version"] = version
+        return weights
+
+    weights, _ = get_or_compute("contiguity_weights", {"province": settings.prov_code_jabar}, compute, version=version)
+    return weights
+
+
 def parse_kabkota_codes(raw: str | None) -> list[int]:
     if not raw:
         return []
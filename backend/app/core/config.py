@@ -1,4 +1,5 @@
-﻿from functools import lru_cache
+﻿import os
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
@@ -16,15 +17,66 @@ class Settings(BaseSettings):
     data_dir_processed: str = str(PROJECT_ROOT / "data" / "processed")
     data_dir_cache: str = str(PROJECT_ROOT / "data" / "cache")
     jabar_geojson_path: str = "data\\raw\\jabar-kabkota.geojson"
+    # Kabupaten/kota boundaries (KDPPUM = province code, KDPKAB = "32.01") for
+    # the spatial weights.
+    kabkota_boundaries_path: str = str(PROJECT_ROOT / "data" / "raw" / "indonesia_kabupaten_kota.json")
 
     default_start_year: int = 2017
     default_end_year: int = 2024
 
     prov_code_jabar: int = 32
     prov_name_jabar: str = "JAWA BARAT"
+    # Rows per chunk when reading source CSVs (bounds peak ingestion memory).
+    ingest_chunk_rows: int = 200_000
 
     cors_allow_origins: list[str] = ["*"]
 
+    log_level: str = "INFO"
+    log_format: str = "json"
+    # Access lines: fraction logged overall, per path prefix overrides (longest
+    # prefix wins); 5xx and requests slower than log_slow_request_ms always log.
+    log_access_sample_rate: float = 1.0
+    log_access_sample_rates: dict[str, float] = {}
+    log_slow_request_ms: float = 1000.0
+
+    # Data-version ETags on GET /api/*; Cache-Control is sent alongside them.
+    http_cache_enabled: bool = True
+    http_cache_control: str = "public, no-cache"
+    # How long the data version behind ETags is reused before the files are
+    # checked again (off the event loop).
+    http_cache_version_ttl_ms: float = 1000.0
+    # br (when the brotli package is installed) or gzip above this many bytes.
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+
+    # Per-request profiling (X-Profile header or ?profile=pstats|speedscope);
+    # with a token set, X-Profile-Token must match it.
+    profiling_enabled: bool = False
+    profiling_token: str = ""
+    profiling_interval_ms: float = 1.0
+
+    warmup_imports: bool = True
+    # In-process result cache (L1): most recently used entries kept per process
+    # (results and compressed bodies; a warm-up pass fills several hundred).
+    cache_l1_max_entries: int = 2048
+    # Shared SQLite result cache (L2) under data_dir_cache, behind the in-process one.
+    cache_l2_enabled: bool = True
+    cache_l2_max_mb: int = 256
+    # Serve the previous data version's result while the new one computes.
+    cache_stale_while_revalidate: bool = True
+    # Background replay of the dashboard's queries after startup and rebuilds.
+    cache_warmup_enabled: bool = True
+    cache_warmup_pause_ms: int = 50
+    # Processes used for per-series forecast fits, per API worker process (each
+    # one cold-imports statsmodels); 0 means one per CPU.
+    forecast_workers: int = 2
+
+    @property
+    def resolved_forecast_workers(self) -> int:
+        return self.forecast_workers or os.cpu_count() or 1
+
     class Config:
         env_prefix = "PKH_"
 
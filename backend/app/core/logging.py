@@ -1,17 +1,74 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import time
+from contextvars import ContextVar
+
+from app.core.config import get_settings
+
+# Records are put on a queue by the calling thread and formatted/written by a
+# QueueListener thread, so request threads never block on log I/O. Output is
+# one JSON object per line (PKH_LOG_FORMAT=text restores the plain format).
 
 _LOGGING_CONFIGURED = False
+_LISTENER: logging.handlers.QueueListener | None = None
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not user-supplied extra fields.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request ID (runs in the calling thread)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
 
 
 def setup_logging() -> None:
-    global _LOGGING_CONFIGURED
+    global _LOGGING_CONFIGURED, _LISTENER
     if _LOGGING_CONFIGURED:
         return
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-    )
+    settings = get_settings()
+    stream = logging.StreamHandler()
+    if settings.log_format == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
+    root.addHandler(queue_handler)
+
+    _LISTENER = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _LISTENER.start()
+    atexit.register(_LISTENER.stop)
     _LOGGING_CONFIGURED = True
 
 
@@ -2,25 +2,28 @@ from typing import Any
 
 import pandas as pd
 
+from app.data.analysis.kabkota_index import KabkotaIndex
+
 
 def compute_compare_years(
     df: pd.DataFrame,
     value_column: str,
     year_a: int,
     year_b: int,
+    dim_kabupaten: pd.DataFrame,
 ) -> list[dict[str, Any]]:
+    index = KabkotaIndex(dim_kabupaten)
     df_a = df[df["tahun"] == year_a][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", value_column]
+        ["kode_kabupaten_kota", value_column]
     ].rename(columns={value_column: "value_a"})
     df_b = df[df["tahun"] == year_b][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", value_column]
+        ["kode_kabupaten_kota", value_column]
     ].rename(columns={value_column: "value_b"})
 
-    merged = df_a.merge(
-        df_b, on=["kode_kabupaten_kota", "nama_kabupaten_kota"], how="inner"
-    )
+    merged = index.join(df_a, [(df_b, ["value_b"])])
     if merged.empty:
         return []
 
+    merged = index.with_names(merged)
     merged["delta"] = merged["value_b"] - merged["value_a"]
     return merged.sort_values("delta", ascending=False).to_dict(orient="records")
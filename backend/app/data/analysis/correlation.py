@@ -1,20 +1,24 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from app.data.analysis.kabkota_index import KabkotaIndex
+from app.data.metrics import METRICS
+
 
 def compute_correlation(
     df_pkh: pd.DataFrame,
     df_persen: pd.DataFrame,
     year: int,
+    dim_kabupaten: pd.DataFrame,
 ) -> dict[str, Any]:
     pkh_year = df_pkh[df_pkh["tahun"] == year]
     persen_year = df_persen[df_persen["tahun"] == year]
 
-    merged = pkh_year.merge(
-        persen_year,
-        on=["kode_kabupaten_kota", "nama_kabupaten_kota", "tahun"],
-        how="inner",
+    merged = KabkotaIndex(dim_kabupaten).join(
+        pkh_year[["kode_kabupaten_kota", "jumlah_penerima_manfaat"]],
+        [(persen_year, ["persentase_penduduk_miskin"])],
     )
 
     if merged.empty:
@@ -22,3 +26,125 @@ def compute_correlation(
 
     r_value = merged["jumlah_penerima_manfaat"].corr(merged["persentase_penduduk_miskin"])
     return {"n": int(len(merged)), "r": float(r_value)}
+
+
+CORRELATION_METRICS = {key: spec.value_col for key, spec in METRICS.items()}
+
+
+def _to_float(value: float) -> float | None:
+    return float(value) if np.isfinite(value) else None
+
+
+def _pearson_columns(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Column-wise Pearson r over pairwise-complete rows of two equally shaped matrices."""
+    mask = np.isfinite(a) & np.isfinite(b)
+    n = mask.sum(axis=0)
+    a = np.where(mask, a, 0.0)
+    b = np.where(mask, b, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_mean = a.sum(axis=0) / n
+        b_mean = b.sum(axis=0) / n
+        da = np.where(mask, a - a_mean, 0.0)
+        db = np.where(mask, b - b_mean, 0.0)
+        r = (da * db).sum(axis=0) / np.sqrt((da * da).sum(axis=0) * (db * db).sum(axis=0))
+
+    return np.where(n >= 2, r, np.nan), n
+
+
+def _rank_columns(values: np.ndarray) -> np.ndarray:
+    return pd.DataFrame(values).rank(axis=0).to_numpy(dtype=float)
+
+
+def _spearman_columns(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    mask = np.isfinite(a) & np.isfinite(b)
+    ranks_a = _rank_columns(np.where(mask, a, np.nan))
+    ranks_b = _rank_columns(np.where(mask, b, np.nan))
+    r, _ = _pearson_columns(ranks_a, ranks_b)
+    return r
+
+
+def compute_correlation_matrix(
+    frames: dict[str, pd.DataFrame],
+    start: int,
+    end: int,
+    max_lag: int,
+) -> dict[str, Any]:
+    """Per-year and lagged Pearson/Spearman correlations for every metric pair.
+
+    ``frames`` maps each key of ``CORRELATION_METRICS`` to its fact table. Each
+    metric is pivoted once into an aligned (kabkota x year) matrix and every
+    correlation is computed column-wise on those matrices.
+    """
+    years = list(range(start, end + 1))
+    codes = sorted(
+        set().union(*(df["kode_kabupaten_kota"].dropna().unique() for df in frames.values()))
+    )
+
+    matrices: dict[str, np.ndarray] = {}
+    for metric, value_col in CORRELATION_METRICS.items():
+        df = frames[metric]
+        df = df[(df["tahun"] >= start) & (df["tahun"] <= end)]
+        matrices[metric] = (
+            df.pivot_table(index="kode_kabupaten_kota", columns="tahun", values=value_col)
+            .reindex(index=codes, columns=years)
+            .to_numpy(dtype=float)
+        )
+
+    metrics = list(CORRELATION_METRICS)
+    n_codes = len(codes)
+    n_years = len(years)
+
+    # Same-year pairs: one column per (pair, year), stacked side by side.
+    pairs = [(x, y) for i, x in enumerate(metrics) for y in metrics[i + 1:]]
+    a = np.hstack([matrices[x] for x, _ in pairs]) if pairs else np.empty((n_codes, 0))
+    b = np.hstack([matrices[y] for _, y in pairs]) if pairs else np.empty((n_codes, 0))
+    pearson, n = _pearson_columns(a, b)
+    spearman = _spearman_columns(a, b)
+
+    by_year: list[dict[str, Any]] = []
+    for p, (x_metric, y_metric) in enumerate(pairs):
+        for col, year in enumerate(years):
+            k = p * n_years + col
+            by_year.append(
+                {
+                    "tahun": year,
+                    "x": x_metric,
+                    "y": y_metric,
+                    "n": int(n[k]),
+                    "pearson": _to_float(pearson[k]),
+                    "spearman": _to_float(spearman[k]),
+                }
+            )
+
+    # Lagged pairs: x in year t against y in year t + lag, pooled over kabkota and
+    # years. Each (pair, lag) becomes one NaN-padded column of length kabkota x year.
+    lag_cases = [
+        (x, y, lag)
+        for x in metrics
+        for y in metrics
+        if x != y
+        for lag in range(0, min(max_lag, n_years - 1) + 1)
+    ]
+    a = np.full((n_codes * n_years, len(lag_cases)), np.nan)
+    b = np.full((n_codes * n_years, len(lag_cases)), np.nan)
+    for col, (x_metric, y_metric, lag) in enumerate(lag_cases):
+        size = n_codes * (n_years - lag)
+        a[:size, col] = matrices[x_metric][:, : n_years - lag].ravel()
+        b[:size, col] = matrices[y_metric][:, lag:].ravel()
+    pearson, n = _pearson_columns(a, b)
+    spearman = _spearman_columns(a, b)
+
+    lagged = [
+        {
+            "x": x_metric,
+            "y": y_metric,
+            "lag": lag,
+            "n": int(n[col]),
+            "pearson": _to_float(pearson[col]),
+            "spearman": _to_float(spearman[col]),
+        }
+        for col, (x_metric, y_metric, lag) in enumerate(lag_cases)
+    ]
+
+    return {"metrics": metrics, "by_year": by_year, "lagged": lagged}
@@ -1,7 +1,10 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from app.data.analysis.kabkota_matrix import clamp_years, year_block
+
 
 def compute_effectiveness(
     df_pkh: pd.DataFrame,
@@ -29,12 +32,138 @@ def compute_effectiveness(
 
     merged["delta_pkh"] = merged["total_pkh"].diff()
     merged["delta_kemiskinan"] = merged["avg_kemiskinan"].diff()
-    def _ratio(row):
-        if pd.isna(row["delta_pkh"]) or row["delta_pkh"] == 0:
-            return None
-        return row["delta_kemiskinan"] / row["delta_pkh"]
-
-    merged["ratio"] = merged.apply(_ratio, axis=1)
+    valid = merged["delta_pkh"].notna() & (merged["delta_pkh"] != 0)
+    ratio = merged["delta_kemiskinan"] / merged["delta_pkh"].where(valid)
+    merged["ratio"] = ratio.astype(object).where(valid, None)
 
     records = merged.to_dict(orient="records")
     return records
+
+
+def _log(values: np.ndarray) -> np.ndarray:
+    logged = np.full(values.shape, np.nan)
+    positive = values > 0
+    logged[positive] = np.log(values[positive])
+    return logged
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, NaN where the denominator is 0 or missing."""
+    result = np.full(numerator.shape, np.nan)
+    valid = np.isfinite(denominator) & (denominator != 0)
+    result[valid] = numerator[valid] / denominator[valid]
+    return result
+
+
+def _json(values: np.ndarray, integer: bool = False) -> list[Any]:
+    if values.ndim == 2:
+        return [_json(row, integer) for row in values]
+    cast = int if integer else float
+    return [None if np.isnan(value) else cast(value) for value in values]
+
+
+def build_effectiveness_panel(pkh_matrix: dict[str, Any], persen_matrix: dict[str, Any]) -> dict[str, Any]:
+    """pkh and kemiskinan per kabkota over every year either pivot covers.
+
+    Both matrices are kabkota x year pivots over the same dim_kabupaten rows
+    (see kabkota_matrix), so the year-over-year arrays for every kabkota and
+    year pair come from one pass of array operations. Column j of those is the
+    pair years[j] -> years[j + 1]:
+
+    - ratio: delta_kemiskinan / delta_pkh (percentage points per recipient)
+    - elasticity: delta ln(kemiskinan) / delta ln(pkh)
+
+    Built once per data version; compute_kabkota_effectiveness slices it.
+    """
+    stored = np.union1d(pkh_matrix["years"], persen_matrix["years"]).astype(int)
+    years = np.arange(stored[0], stored[-1] + 1) if stored.size else stored
+    pkh = year_block(pkh_matrix, years)
+    persen = year_block(persen_matrix, years)
+    log_pkh, log_persen = _log(pkh), _log(persen)
+    delta_pkh = np.diff(pkh, axis=1)
+    delta_kemiskinan = np.diff(persen, axis=1)
+
+    return {
+        "years": years,
+        "kode_kabupaten_kota": pkh_matrix["kode_kabupaten_kota"],
+        "nama_kabupaten_kota": pkh_matrix["nama_kabupaten_kota"],
+        "pkh_integer": pkh_matrix["integer"],
+        "pkh": pkh,
+        "persen": persen,
+        "log_pkh": log_pkh,
+        "log_persen": log_persen,
+        "delta_pkh": delta_pkh,
+        "delta_kemiskinan": delta_kemiskinan,
+        "ratio": _divide(delta_kemiskinan, delta_pkh),
+        "elasticity": _divide(np.diff(log_persen, axis=1), np.diff(log_pkh, axis=1)),
+    }
+
+
+def compute_kabkota_effectiveness(panel: dict[str, Any], start: int, end: int) -> dict[str, Any]:
+    """Per-kabkota effectiveness of PKH on poverty, for years start..end.
+
+    Years are clamped to the panel's span (see clamp_years). The
+    year-over-year arrays are the panel's columns for those years; the
+    cumulative_* arrays are start -> end changes and their ratio, and
+    cumulative_elasticity is the least-squares slope of ln(kemiskinan) on
+    ln(pkh) over the n_years where both are known (at least two).
+    """
+    years = clamp_years([panel], start, end)
+    first = int(np.searchsorted(panel["years"], years[0])) if years.size else 0
+    columns = slice(first, first + years.size)
+    pairs = slice(first, first + max(years.size - 1, 0))
+    pkh, persen = panel["pkh"][:, columns], panel["persen"][:, columns]
+    log_pkh, log_persen = panel["log_pkh"][:, columns], panel["log_persen"][:, columns]
+
+    if years.size:
+        cumulative_pkh = pkh[:, -1] - pkh[:, 0]
+        cumulative_kemiskinan = persen[:, -1] - persen[:, 0]
+    else:
+        cumulative_pkh = cumulative_kemiskinan = np.full(pkh.shape[0], np.nan)
+
+    known = np.isfinite(log_pkh) & np.isfinite(log_persen)
+    n_years = known.sum(axis=1)
+    counts = np.maximum(n_years, 1)[:, None]
+    x = np.where(known, log_pkh, 0.0)
+    y = np.where(known, log_persen, 0.0)
+    x_centered = np.where(known, x - x.sum(axis=1, keepdims=True) / counts, 0.0)
+    y_centered = np.where(known, y - y.sum(axis=1, keepdims=True) / counts, 0.0)
+    slope = _divide((x_centered * y_centered).sum(axis=1), (x_centered**2).sum(axis=1))
+    slope[n_years < 2] = np.nan
+
+    return {
+        "years": years,
+        "kode_kabupaten_kota": panel["kode_kabupaten_kota"],
+        "nama_kabupaten_kota": panel["nama_kabupaten_kota"],
+        "pkh_integer": panel["pkh_integer"],
+        "delta_pkh": panel["delta_pkh"][:, pairs],
+        "delta_kemiskinan": panel["delta_kemiskinan"][:, pairs],
+        "ratio": panel["ratio"][:, pairs],
+        "elasticity": panel["elasticity"][:, pairs],
+        "cumulative_delta_pkh": cumulative_pkh,
+        "cumulative_delta_kemiskinan": cumulative_kemiskinan,
+        "cumulative_ratio": _divide(cumulative_kemiskinan, cumulative_pkh),
+        "cumulative_elasticity": slope,
+        "n_years": n_years,
+    }
+
+
+def kabkota_effectiveness_rows(panel: dict[str, Any], row_mask: np.ndarray) -> dict[str, Any]:
+    """JSON-ready ``panel`` (from compute_kabkota_effectiveness) restricted to the rows in ``row_mask``."""
+    integer = panel["pkh_integer"]
+    return {
+        "years": panel["years"].tolist(),
+        "kode_kabupaten_kota": [int(code) for code in panel["kode_kabupaten_kota"][row_mask]],
+        "nama_kabupaten_kota": [str(name) for name in panel["nama_kabupaten_kota"][row_mask]],
+        "delta_pkh": _json(panel["delta_pkh"][row_mask], integer),
+        "delta_kemiskinan": _json(panel["delta_kemiskinan"][row_mask]),
+        "ratio": _json(panel["ratio"][row_mask]),
+        "elasticity": _json(panel["elasticity"][row_mask]),
+        "cumulative": {
+            "delta_pkh": _json(panel["cumulative_delta_pkh"][row_mask], integer),
+            "delta_kemiskinan": _json(panel["cumulative_delta_kemiskinan"][row_mask]),
+            "ratio": _json(panel["cumulative_ratio"][row_mask]),
+            "elasticity": _json(panel["cumulative_elasticity"][row_mask]),
+            "n_years": panel["n_years"][row_mask].tolist(),
+        },
+    }
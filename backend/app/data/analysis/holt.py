@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Additive-trend Holt fitted for many equal-length series at once. Parameters
+# follow statsmodels' ExponentialSmoothing: component-form smoothing_level
+# (alpha) and smoothing_trend (beta) with 0 < alpha < 1 and 0 <= beta <= alpha,
+# and initial level/trend estimated by minimizing the SSE.
+#
+# For fixed (alpha, beta) the one-step errors are linear in (l0, b0), so the
+# optimal initial states are a 2x2 least-squares solve. Only (alpha, beta) is
+# searched: a coarse grid for every series, then a shrinking pattern search
+# around each series' best point.
+
+ALPHA_MIN = 1e-4
+ALPHA_MAX = 1.0 - 1e-4
+GRID_ALPHA = np.linspace(ALPHA_MIN, ALPHA_MAX, 25)
+GRID_RATIO = np.linspace(0.0, 1.0, 21)
+REFINE_STEPS = 12
+
+
+def _errors(y: np.ndarray, alpha: np.ndarray, beta: np.ndarray, l0, b0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run the error-correction recursion; returns errors and the final states.
+
+    ``y`` has shape (S, n); ``alpha``, ``beta``, ``l0`` and ``b0`` broadcast to (S, G).
+    """
+    n = y.shape[-1]
+    shape = np.broadcast_shapes(y.shape[:-1] + (1,), np.shape(alpha), np.shape(l0))
+    level = np.broadcast_to(l0, shape).astype(float)
+    trend = np.broadcast_to(b0, shape).astype(float)
+    alpha_beta = alpha * beta
+    errors = np.empty(level.shape + (n,))
+    for t in range(n):
+        fitted = level + trend
+        error = y[..., t, None] - fitted
+        errors[..., t] = error
+        level = fitted + alpha * error
+        trend = trend + alpha_beta * error
+    return errors, level, trend
+
+
+def _fit_initial_states(y: np.ndarray, alpha: np.ndarray, beta: np.ndarray):
+    """Least-squares (l0, b0) and SSE for every (series, candidate) pair."""
+    zeros = np.zeros_like(y)
+    e_y, _, _ = _errors(y, alpha, beta, 0.0, 0.0)
+    e_l, _, _ = _errors(zeros, alpha, beta, 1.0, 0.0)
+    e_b, _, _ = _errors(zeros, alpha, beta, 0.0, 1.0)
+    # e(l0, b0) = e_y + l0 * e_l + b0 * e_b, since e_l/e_b are responses to unit states.
+    e_l = -e_l
+    e_b = -e_b
+
+    s_ll = np.sum(e_l * e_l, axis=-1)
+    s_bb = np.sum(e_b * e_b, axis=-1)
+    s_lb = np.sum(e_l * e_b, axis=-1)
+    r_l = np.sum(e_y * e_l, axis=-1)
+    r_b = np.sum(e_y * e_b, axis=-1)
+    det = s_ll * s_bb - s_lb * s_lb
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        l0 = (r_l * s_bb - r_b * s_lb) / det
+        b0 = (r_b * s_ll - r_l * s_lb) / det
+    singular = ~np.isfinite(l0) | ~np.isfinite(b0) | (np.abs(det) < 1e-12)
+    l0 = np.where(singular, y[..., :1], l0)
+    b0 = np.where(singular, 0.0, b0)
+
+    resid = e_y - l0[..., None] * e_l - b0[..., None] * e_b
+    sse = np.sum(resid * resid, axis=-1)
+    return l0, b0, sse
+
+
+def _to_params(alpha: np.ndarray, ratio: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    alpha = np.clip(alpha, ALPHA_MIN, ALPHA_MAX)
+    return alpha, alpha * np.clip(ratio, 0.0, 1.0)
+
+
+def fit_holt_batch(y: np.ndarray) -> dict[str, np.ndarray]:
+    """Fit additive Holt to every row of ``y`` (shape (S, n), no NaNs)."""
+    y = np.asarray(y, dtype=float)
+    scale = np.maximum(np.abs(y).mean(axis=1, keepdims=True), 1e-12)
+    y_scaled = y / scale
+
+    grid_alpha, grid_ratio = np.meshgrid(GRID_ALPHA, GRID_RATIO, indexing="ij")
+    grid_alpha = grid_alpha.ravel()[None, :]
+    grid_ratio = grid_ratio.ravel()[None, :]
+    alpha, beta = _to_params(grid_alpha, grid_ratio)
+    _, _, sse = _fit_initial_states(y_scaled, alpha, beta)
+
+    best = np.argmin(sse, axis=1)
+    best_alpha = grid_alpha[0, best]
+    best_ratio = grid_ratio[0, best]
+    best_sse = sse[np.arange(len(y)), best]
+
+    # Pattern search: evaluate a 3x3 neighbourhood per series, halve the step.
+    step_alpha = GRID_ALPHA[1] - GRID_ALPHA[0]
+    step_ratio = GRID_RATIO[1] - GRID_RATIO[0]
+    offsets = np.array([-1.0, 0.0, 1.0])
+    off_alpha, off_ratio = np.meshgrid(offsets, offsets, indexing="ij")
+    off_alpha = off_alpha.ravel()[None, :]
+    off_ratio = off_ratio.ravel()[None, :]
+    for _ in range(REFINE_STEPS):
+        cand_alpha = np.clip(best_alpha[:, None] + off_alpha * step_alpha, ALPHA_MIN, ALPHA_MAX)
+        cand_ratio = np.clip(best_ratio[:, None] + off_ratio * step_ratio, 0.0, 1.0)
+        alpha, beta = _to_params(cand_alpha, cand_ratio)
+        _, _, sse = _fit_initial_states(y_scaled, alpha, beta)
+        idx = np.argmin(sse, axis=1)
+        rows = np.arange(len(y))
+        improved = sse[rows, idx] < best_sse
+        best_alpha = np.where(improved, cand_alpha[rows, idx], best_alpha)
+        best_ratio = np.where(improved, cand_ratio[rows, idx], best_ratio)
+        best_sse = np.where(improved, sse[rows, idx], best_sse)
+        step_alpha /= 2
+        step_ratio /= 2
+
+    alpha, beta = _to_params(best_alpha[:, None], best_ratio[:, None])
+    l0, b0, _ = _fit_initial_states(y_scaled, alpha, beta)
+    errors, level, trend = _errors(y_scaled, alpha, beta, l0, b0)
+
+    scale = scale[:, 0]
+    return {
+        "alpha": alpha[:, 0],
+        "beta": beta[:, 0],
+        "initial_level": l0[:, 0] * scale,
+        "initial_trend": b0[:, 0] * scale,
+        "level": level[:, 0] * scale,
+        "trend": trend[:, 0] * scale,
+        "sse": np.sum(errors[:, 0, :] ** 2, axis=-1) * scale**2,
+    }
+
+
+def forecast_holt_batch(fit: dict[str, np.ndarray], horizon: int) -> dict[str, np.ndarray]:
+    """Point forecasts, residual sigma and h-step variance factors for a batch fit."""
+    steps = np.arange(1, horizon + 1, dtype=float)
+    values = fit["level"][:, None] + steps[None, :] * fit["trend"][:, None]
+
+    # ETS(A,A,N): psi_j = alpha * (1 + j * beta).
+    psi = fit["alpha"][:, None] * (1.0 + np.arange(1, horizon)[None, :] * fit["beta"][:, None])
+    factors = 1.0 + np.concatenate([np.zeros((len(values), 1)), np.cumsum(psi**2, axis=1)], axis=1)
+    return {"values": values, "factors": factors}
@@ -2,56 +2,48 @@ from typing import Any
 
 import pandas as pd
 
+from app.data.analysis.kabkota_index import KabkotaIndex
+from app.data.analysis.ranking import top_k_indices
+
 
 def compute_insights(
     df_pkh: pd.DataFrame,
     df_persen: pd.DataFrame,
     start: int,
     end: int,
+    dim_kabupaten: pd.DataFrame,
 ) -> dict[str, Any]:
+    index = KabkotaIndex(dim_kabupaten)
     pkh_start = df_pkh[df_pkh["tahun"] == start][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penerima_manfaat"]
+        ["kode_kabupaten_kota", "jumlah_penerima_manfaat"]
     ].rename(columns={"jumlah_penerima_manfaat": "pkh_start"})
-    pkh_end = df_pkh[df_pkh["tahun"] == end][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penerima_manfaat"]
-    ].rename(columns={"jumlah_penerima_manfaat": "pkh_end"})
-
-    misk_start = df_persen[df_persen["tahun"] == start][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", "persentase_penduduk_miskin"]
-    ].rename(columns={"persentase_penduduk_miskin": "misk_start"})
-    misk_end = df_persen[df_persen["tahun"] == end][
-        ["kode_kabupaten_kota", "nama_kabupaten_kota", "persentase_penduduk_miskin"]
-    ].rename(columns={"persentase_penduduk_miskin": "misk_end"})
-
-    merged = pkh_start.merge(
-        pkh_end, on=["kode_kabupaten_kota", "nama_kabupaten_kota"], how="inner"
-    ).merge(
-        misk_start, on=["kode_kabupaten_kota", "nama_kabupaten_kota"], how="inner"
-    ).merge(
-        misk_end, on=["kode_kabupaten_kota", "nama_kabupaten_kota"], how="inner"
+    pkh_end = df_pkh[df_pkh["tahun"] == end].rename(columns={"jumlah_penerima_manfaat": "pkh_end"})
+    misk_start = df_persen[df_persen["tahun"] == start].rename(
+        columns={"persentase_penduduk_miskin": "misk_start"}
+    )
+    misk_end = df_persen[df_persen["tahun"] == end].rename(
+        columns={"persentase_penduduk_miskin": "misk_end"}
+    )
+
+    merged = index.join(
+        pkh_start,
+        [(pkh_end, ["pkh_end"]), (misk_start, ["misk_start"]), (misk_end, ["misk_end"])],
     )
 
     if merged.empty:
         return {"top_improve": [], "top_worsen": [], "top_pkh_increase": []}
 
+    merged = index.with_names(merged)
     merged["delta_kemiskinan"] = merged["misk_end"] - merged["misk_start"]
     merged["delta_pkh"] = merged["pkh_end"] - merged["pkh_start"]
 
-    top_improve = (
-        merged.sort_values("delta_kemiskinan", ascending=True)
-        .head(5)
-        .to_dict(orient="records")
-    )
-    top_worsen = (
-        merged.sort_values("delta_kemiskinan", ascending=False)
-        .head(5)
-        .to_dict(orient="records")
-    )
-    top_pkh_increase = (
-        merged.sort_values("delta_pkh", ascending=False)
-        .head(5)
-        .to_dict(orient="records")
-    )
+    def top(column: str, largest: bool) -> list[dict[str, Any]]:
+        rows = top_k_indices(merged[column].to_numpy(dtype=float), 5, largest=largest)
+        return merged.iloc[rows].to_dict(orient="records")
+
+    top_improve = top("delta_kemiskinan", largest=False)
+    top_worsen = top("delta_kemiskinan", largest=True)
+    top_pkh_increase = top("delta_pkh", largest=True)
 
     return {
         "top_improve": top_improve,
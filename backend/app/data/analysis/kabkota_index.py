@@ -0,0 +1,109 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Fact tables are joined on kode_kabupaten_kota (and tahun) only. Codes are
+# mapped to their row in dim_kabupaten through a direct-address array, so a
+# join is array indexing on those positions; names are taken from
+# dim_kabupaten once the result rows are known, so a spelling difference
+# between sources can no longer drop rows.
+
+
+class KabkotaIndex:
+    """Position of each kode_kabupaten_kota in dim_kabupaten."""
+
+    def __init__(self, dim_kabupaten: pd.DataFrame) -> None:
+        dim = dim_kabupaten.dropna(subset=["kode_kabupaten_kota"])
+        self.codes = dim["kode_kabupaten_kota"].to_numpy(dtype=np.int64)
+        self.names = dim["nama_kabupaten_kota"].reset_index(drop=True)
+        self.lookup = np.full(int(self.codes.max()) + 1 if self.codes.size else 0, -1, dtype=np.intp)
+        self.lookup[self.codes] = np.arange(self.codes.size)
+
+    def __len__(self) -> int:
+        return int(self.codes.size)
+
+    def positions(self, codes: Any) -> np.ndarray:
+        """Row of each code in dim_kabupaten, -1 for codes it does not list."""
+        values = np.asarray(codes, dtype=float)
+        valid = np.isfinite(values) & (values >= 0) & (values < self.lookup.size) & (values % 1 == 0)
+        positions = np.full(values.shape, -1, dtype=np.intp)
+        positions[valid] = self.lookup[values[valid].astype(np.intp)]
+        return positions
+
+    def slots(self, df: pd.DataFrame, years: tuple[int, int] | None = None) -> np.ndarray:
+        """Dense key per row: the code position, or position x year when ``years`` is given."""
+        positions = self.positions(df["kode_kabupaten_kota"])
+        if years is None:
+            return positions
+        start, end = years
+        tahun = df["tahun"].to_numpy(dtype=float)
+        in_range = (positions >= 0) & np.isfinite(tahun) & (tahun >= start) & (tahun <= end)
+        slots = np.full(positions.shape, -1, dtype=np.intp)
+        slots[in_range] = positions[in_range] * (end - start + 1) + (tahun[in_range].astype(np.intp) - start)
+        return slots
+
+    def n_slots(self, years: tuple[int, int] | None = None) -> int:
+        return len(self) * (years[1] - years[0] + 1 if years else 1)
+
+    def lookup_values(
+        self,
+        left_slots: np.ndarray,
+        right: pd.DataFrame,
+        columns: list[str],
+        years: tuple[int, int] | None = None,
+    ) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """Values of ``right``'s columns at each left slot, and which slots matched."""
+        right_slots = self.slots(right, years)
+        keep = right_slots >= 0
+        right_slots = right_slots[keep]
+        present = np.zeros(self.n_slots(years), dtype=bool)
+        present[right_slots] = True
+        found = left_slots >= 0
+        matched = np.zeros(left_slots.shape, dtype=bool)
+        matched[found] = present[left_slots[found]]
+
+        values = {}
+        for column in columns:
+            source = right[column].to_numpy()[keep]
+            dense = np.zeros(present.size, dtype=source.dtype)
+            dense[right_slots] = source
+            array = np.zeros(left_slots.shape, dtype=source.dtype)
+            array[found] = dense[left_slots[found]]
+            values[column] = array
+        return values, matched
+
+    def join(
+        self,
+        left: pd.DataFrame,
+        rights: list[tuple[pd.DataFrame, list[str]]],
+        how: str = "inner",
+        years: tuple[int, int] | None = None,
+    ) -> pd.DataFrame:
+        """Attach ``rights``' columns to ``left`` by code (and year), keeping left's row order.
+
+        ``how="left"`` keeps unmatched left rows with NaN values, as a pandas
+        left merge would; ``how="inner"`` drops rows missing from any right.
+        """
+        left_slots = self.slots(left, years)
+        joined = left.reset_index(drop=True)
+        keep = np.ones(len(joined), dtype=bool) if how == "left" else left_slots >= 0
+        for right, columns in rights:
+            values, matched = self.lookup_values(left_slots, right, columns, years)
+            for column, array in values.items():
+                if how == "left" and not matched.all():
+                    array = np.where(matched, array, np.nan)
+                joined[column] = array
+            if how == "inner":
+                keep &= matched
+        return joined[keep].reset_index(drop=True)
+
+    def with_names(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with nama_kabupaten_kota from dim_kabupaten right after the code column."""
+        positions = self.positions(df["kode_kabupaten_kota"])
+        found = positions >= 0
+        names = np.full(len(df), np.nan, dtype=object)
+        names[found] = self.names.to_numpy()[positions[found]]
+        df = df.drop(columns=["nama_kabupaten_kota"], errors="ignore")
+        df.insert(df.columns.get_loc("kode_kabupaten_kota") + 1, "nama_kabupaten_kota", names)
+        return df
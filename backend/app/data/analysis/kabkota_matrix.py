@@ -0,0 +1,98 @@
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from app.data.analysis.kabkota_index import KabkotaIndex
+
+
+def pivot_kabkota_matrix(df: pd.DataFrame, value_column: str, dim_kabupaten: pd.DataFrame) -> dict[str, Any]:
+    """Dense (kabkota x year) matrix of one fact table, rows in dim_kabupaten order.
+
+    Covers every year present in ``df``; cells without a value are NaN.
+    """
+    index = KabkotaIndex(dim_kabupaten)
+    years = np.sort(df["tahun"].dropna().unique()).astype(int)
+    positions = index.positions(df["kode_kabupaten_kota"])
+    columns = np.searchsorted(years, df["tahun"].to_numpy(dtype=float))
+    found = (positions >= 0) & df["tahun"].notna().to_numpy()
+
+    values = np.full((len(index), len(years)), np.nan)
+    values[positions[found], columns[found]] = df[value_column].to_numpy(dtype=float)[found]
+    return {
+        "kode_kabupaten_kota": index.codes,
+        "nama_kabupaten_kota": index.names.to_numpy(dtype=object),
+        "years": years,
+        "values": values,
+        "integer": pd.api.types.is_integer_dtype(df[value_column]),
+    }
+
+
+def kabkota_row_mask(matrix: dict[str, Any], tipe: str, codes: Iterable[int]) -> np.ndarray:
+    """Rows kept by the tipe / kode filters (see apply_kabkota_filters)."""
+    names = pd.Series(matrix["nama_kabupaten_kota"], dtype=object).astype(str)
+    mask = np.ones(len(names), dtype=bool)
+    codes = list(codes)
+    if codes:
+        mask &= np.isin(matrix["kode_kabupaten_kota"], codes)
+    if tipe == "kota":
+        mask &= names.str.startswith("KOTA ").to_numpy()
+    elif tipe == "kabupaten":
+        mask &= names.str.startswith("KABUPATEN ").to_numpy()
+    return mask
+
+
+def year_block(matrix: dict[str, Any], years: np.ndarray) -> np.ndarray:
+    """The matrix's columns for ``years``, NaN for years it has no data for."""
+    stored = matrix["years"]
+    columns = np.searchsorted(stored, years)
+    present = np.zeros(years.size, dtype=bool)
+    if stored.size:
+        present = stored[np.minimum(columns, stored.size - 1)] == years
+    block = np.full((matrix["values"].shape[0], years.size), np.nan)
+    block[:, present] = matrix["values"][:, columns[present]]
+    return block
+
+
+def clamp_years(matrices: Iterable[dict[str, Any]], start: int, end: int) -> np.ndarray:
+    """Years start..end, clamped to the first..last year the matrices have data for.
+
+    Keeps the columns built per request bounded by the stored data whatever
+    range is asked for; gaps inside that span stay (NaN in year_block).
+    """
+    stored = [matrix["years"] for matrix in matrices if matrix["years"].size]
+    if not stored:
+        return np.arange(0)
+    first = max(start, min(int(years[0]) for years in stored))
+    last = min(end, max(int(years[-1]) for years in stored))
+    return np.arange(first, last + 1)
+
+
+def _json_rows(values: np.ndarray, integer: bool) -> list[list[Any]]:
+    cast = int if integer else float
+    return [[None if np.isnan(value) else cast(value) for value in row] for row in values]
+
+
+def compute_kabkota_matrix(
+    matrices: dict[str, dict[str, Any]],
+    start: int,
+    end: int,
+    row_mask: np.ndarray,
+) -> dict[str, Any]:
+    """Column-oriented kabkota x year values per metric, for years start..end.
+
+    ``matrices`` maps metric to its pivot (same dim_kabupaten rows). Years
+    are clamped to the span the matrices cover (see clamp_years); years in it
+    that a metric has no data for come back as null columns.
+    """
+    years = clamp_years(matrices.values(), start, end)
+    first = next(iter(matrices.values()))
+    data: dict[str, Any] = {
+        "years": years.tolist(),
+        "kode_kabupaten_kota": [int(code) for code in first["kode_kabupaten_kota"][row_mask]],
+        "nama_kabupaten_kota": [str(name) for name in first["nama_kabupaten_kota"][row_mask]],
+        "values": {},
+    }
+    for metric, matrix in matrices.items():
+        data["values"][metric] = _json_rows(year_block(matrix, years)[row_mask], matrix["integer"])
+    return data
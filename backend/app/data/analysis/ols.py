@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+
+OLS_FIELDS = ("n", "intercept", "slope", "se_intercept", "se_slope", "r2", "p_value")
+
+
+def _group_sum(values: np.ndarray, group_ids: np.ndarray, n_groups: int) -> np.ndarray:
+    return np.bincount(group_ids, weights=values, minlength=n_groups)
+
+
+def within_transform(values: np.ndarray, entity_ids: np.ndarray) -> np.ndarray:
+    """Subtract the per-entity mean (fixed-effects within transformation)."""
+    values = np.asarray(values, dtype=float)
+    n_entities = int(entity_ids.max()) + 1 if entity_ids.size else 0
+    counts = np.bincount(entity_ids, minlength=n_entities)
+    means = _group_sum(values, entity_ids, n_entities) / np.maximum(counts, 1)
+    return values - means[entity_ids]
+
+
+def ols_by_group(
+    x: np.ndarray,
+    y: np.ndarray,
+    group_ids: np.ndarray,
+    n_groups: int,
+    n_absorbed: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Closed-form single-regressor OLS for every group in one pass.
+
+    Rows may appear in several groups by repeating them in ``x``/``y``/``group_ids``.
+    When ``n_absorbed`` is given the data is assumed to be within-transformed:
+    the fit has no intercept and ``n_absorbed[g]`` fixed effects are charged
+    to the residual degrees of freedom of group ``g``.
+    """
+    from scipy.special import stdtr
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    group_ids = np.asarray(group_ids, dtype=np.intp)
+
+    n = np.bincount(group_ids, minlength=n_groups).astype(float)
+    safe_n = np.maximum(n, 1.0)
+
+    if n_absorbed is None:
+        x_mean = _group_sum(x, group_ids, n_groups) / safe_n
+        y_mean = _group_sum(y, group_ids, n_groups) / safe_n
+        dx = x - x_mean[group_ids]
+        dy = y - y_mean[group_ids]
+        df_resid = n - 2
+    else:
+        x_mean = np.zeros(n_groups)
+        y_mean = np.zeros(n_groups)
+        dx = x
+        dy = y
+        df_resid = n - np.asarray(n_absorbed, dtype=float) - 1
+
+    sxx = _group_sum(dx * dx, group_ids, n_groups)
+    sxy = _group_sum(dx * dy, group_ids, n_groups)
+    syy = _group_sum(dy * dy, group_ids, n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid = (df_resid > 0) & (sxx > 0)
+        slope = np.where(valid, sxy / sxx, np.nan)
+        ssr = np.maximum(syy - slope * sxy, 0.0)
+        sigma2 = np.where(valid, ssr / df_resid, np.nan)
+        se_slope = np.sqrt(sigma2 / sxx)
+        r2 = np.where(syy > 0, 1.0 - ssr / syy, np.nan)
+        t_slope = slope / se_slope
+        p_value = np.where(se_slope > 0, 2.0 * stdtr(df_resid, -np.abs(t_slope)), np.nan)
+
+        if n_absorbed is None:
+            intercept = y_mean - slope * x_mean
+            se_intercept = np.sqrt(sigma2 * (1.0 / safe_n + x_mean**2 / sxx))
+        else:
+            intercept = np.full(n_groups, np.nan)
+            se_intercept = np.full(n_groups, np.nan)
+
+    return {
+        "n": n.astype(int),
+        "intercept": intercept,
+        "slope": slope,
+        "se_intercept": se_intercept,
+        "se_slope": se_slope,
+        "r2": r2,
+        "p_value": p_value,
+    }
+
+
+def ols_record(fit: dict[str, np.ndarray], index: int) -> dict[str, float | int | None]:
+    record: dict[str, float | int | None] = {"n": int(fit["n"][index])}
+    for field in OLS_FIELDS[1:]:
+        value = float(fit[field][index])
+        record[field] = value if np.isfinite(value) else None
+    return record
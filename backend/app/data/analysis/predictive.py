@@ -1,19 +1,57 @@
 from __future__ import annotations
 
-from typing import Any, Iterable
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from statistics import NormalDist
+from typing import Any, Iterable, NamedTuple
 
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
+from app.core.logging import get_logger
+from app.data.analysis.holt import fit_holt_batch, forecast_holt_batch
 
-def _forecast_series_holt(values: pd.Series, horizon: int) -> list[float]:
-    values = values.dropna().astype(float)
+logger = get_logger(__name__)
+
+# statsmodels is imported inside the fitting helpers: it accounts for most of
+# the API import time and is only needed once a forecast is requested.
+
+DEFAULT_INTERVAL_LEVEL = 0.95
+
+
+class SeriesForecast(NamedTuple):
+    """Point forecast plus what is needed for its prediction interval.
+
+    The h-step forecast error variance is ``sigma**2 * variance_factors[h - 1]``.
+    A NaN ``sigma`` means the interval is undefined for this series.
+    """
+
+    values: list[float]
+    sigma: float
+    variance_factors: np.ndarray
+
+
+def _naive_forecast(values: pd.Series, horizon: int) -> SeriesForecast:
+    # Random walk: last value carried forward, variance grows linearly with h.
     if values.empty:
-        return [0.0] * horizon
-    if len(values) < 2 or values.nunique() == 1:
-        return [float(values.iloc[-1])] * horizon
+        return SeriesForecast([0.0] * horizon, float("nan"), np.ones(horizon))
+    diffs = np.diff(values.to_numpy(dtype=float))
+    sigma = float(np.sqrt(np.mean(diffs**2))) if diffs.size else float("nan")
+    return SeriesForecast(
+        [float(values.iloc[-1])] * horizon,
+        sigma,
+        np.arange(1, horizon + 1, dtype=float),
+    )
+
+
+def _forecast_series_holt(values: pd.Series, horizon: int) -> SeriesForecast:
+    values = values.dropna().astype(float).reset_index(drop=True)
+    if values.empty or len(values) < 2 or values.nunique() == 1:
+        return _naive_forecast(values, horizon)
+
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
     model = ExponentialSmoothing(
         values,
@@ -23,42 +61,92 @@ def _forecast_series_holt(values: pd.Series, horizon: int) -> list[float]:
     )
     fit = model.fit(optimized=True)
     forecast = fit.forecast(horizon)
-    return [float(x) for x in forecast]
 
+    # ETS(A,A,N): psi_j = alpha * (1 + j * beta), with beta in component form.
+    alpha = float(fit.params["smoothing_level"])
+    beta = float(fit.params["smoothing_trend"])
+    psi = alpha * (1.0 + np.arange(1, horizon) * beta)
+    factors = 1.0 + np.concatenate([[0.0], np.cumsum(psi**2)])
+    sigma = float(np.sqrt(fit.sse / len(values)))
 
-def _forecast_series_arima(values: pd.Series, horizon: int) -> list[float]:
-    values = values.dropna().astype(float)
-    if values.empty:
-        return [0.0] * horizon
-    if len(values) < 3 or values.nunique() == 1:
-        return [float(values.iloc[-1])] * horizon
+    return SeriesForecast([float(x) for x in forecast], sigma, factors)
+
+
+def _forecast_series_arima(values: pd.Series, horizon: int) -> SeriesForecast:
+    values = values.dropna().astype(float).reset_index(drop=True)
+    if values.empty or len(values) < 3 or values.nunique() == 1:
+        return _naive_forecast(values, horizon)
+
+    from statsmodels.tsa.arima.model import ARIMA
 
     model = ARIMA(values, order=(1, 1, 1))
     fit = model.fit()
     forecast = fit.forecast(steps=horizon)
-    return [float(x) for x in forecast]
 
+    # MA(infinity) weights of (1 - phi B)(1 - B) y_t = (1 + theta B) e_t.
+    phi = float(fit.arparams[0]) if len(fit.arparams) else 0.0
+    theta = float(fit.maparams[0]) if len(fit.maparams) else 0.0
+    psi = np.ones(horizon)
+    if horizon > 1:
+        psi[1] = 1.0 + phi + theta
+    for j in range(2, horizon):
+        psi[j] = (1.0 + phi) * psi[j - 1] - phi * psi[j - 2]
+    sigma = float(np.sqrt(fit.params["sigma2"]))
 
-def _forecast_series_linear(values: pd.Series, horizon: int) -> list[float]:
+    return SeriesForecast([float(x) for x in forecast], sigma, np.cumsum(psi**2))
+
+
+def _forecast_series_linear(values: pd.Series, horizon: int) -> SeriesForecast:
     values = values.dropna().astype(float)
-    if values.empty:
-        return [0.0] * horizon
-    if len(values) < 2 or values.nunique() == 1:
-        return [float(values.iloc[-1])] * horizon
+    if values.empty or len(values) < 2 or values.nunique() == 1:
+        return _naive_forecast(values, horizon)
 
-    x = np.arange(len(values))
+    n = len(values)
+    x = np.arange(n)
     coef = np.polyfit(x, values, 1)
-    steps = np.arange(len(values), len(values) + horizon)
+    steps = np.arange(n, n + horizon)
     forecast = coef[0] * steps + coef[1]
-    return [float(x) for x in forecast]
+
+    resid = values.to_numpy() - (coef[0] * x + coef[1])
+    sigma = float(np.sqrt(np.sum(resid**2) / (n - 2))) if n > 2 else float("nan")
+    x_mean = x.mean()
+    factors = 1.0 + 1.0 / n + (steps - x_mean) ** 2 / np.sum((x - x_mean) ** 2)
+
+    return SeriesForecast([float(x) for x in forecast], sigma, factors)
 
 
-def _forecast_series(values: pd.Series, horizon: int) -> tuple[list[float], str]:
+def _forecast_batch_holt_fast(series: list[pd.Series], horizon: int) -> list[SeriesForecast]:
+    """NumPy Holt for many series: equal-length series are fitted in one batch."""
+    forecasts: list[SeriesForecast | None] = [None] * len(series)
+    by_length: dict[int, list[int]] = {}
+    cleaned: list[np.ndarray] = []
+
+    for i, values in enumerate(series):
+        values = values.dropna().astype(float)
+        cleaned.append(values.to_numpy())
+        if values.empty or len(values) < 2 or values.nunique() == 1:
+            forecasts[i] = _naive_forecast(values, horizon)
+        else:
+            by_length.setdefault(len(values), []).append(i)
+
+    for length, indices in by_length.items():
+        fit = fit_holt_batch(np.vstack([cleaned[i] for i in indices]))
+        batch = forecast_holt_batch(fit, horizon)
+        sigma = np.sqrt(fit["sse"] / length)
+        for row, i in enumerate(indices):
+            forecasts[i] = SeriesForecast(
+                [float(x) for x in batch["values"][row]],
+                float(sigma[row]),
+                batch["factors"][row],
+            )
+
+    return forecasts
+
+
+def _forecast_series(values: pd.Series, horizon: int) -> tuple[SeriesForecast, str]:
     values = values.dropna().astype(float)
-    if values.empty:
-        return [0.0] * horizon, "naive"
-    if len(values) < 2 or values.nunique() == 1:
-        return [float(values.iloc[-1])] * horizon, "naive"
+    if values.empty or len(values) < 2 or values.nunique() == 1:
+        return _naive_forecast(values, horizon), "naive"
 
     try:
         return _forecast_series_holt(values, horizon), "holt"
@@ -66,7 +154,7 @@ def _forecast_series(values: pd.Series, horizon: int) -> tuple[list[float], str]
         try:
             return _forecast_series_linear(values, horizon), "linear"
         except Exception:
-            return [float(values.iloc[-1])] * horizon, "naive"
+            return _naive_forecast(values, horizon), "naive"
 
 
 def _clip(values: Iterable[float], min_value: float | None, max_value: float | None) -> list[float]:
@@ -80,97 +168,282 @@ def _clip(values: Iterable[float], min_value: float | None, max_value: float | N
     return clipped
 
 
-def forecast_by_kabkota_method(
-    df: pd.DataFrame,
-    value_col: str,
-    horizon: int,
-    method: str,
-    clip_min: float | None = None,
-    clip_max: float | None = None,
-) -> tuple[list[dict[str, Any]], int, int]:
-    results: list[dict[str, Any]] = []
+def _clip_array(values: np.ndarray, min_value: float | None, max_value: float | None) -> np.ndarray:
+    if min_value is not None:
+        values = np.maximum(values, min_value)
+    if max_value is not None:
+        values = np.minimum(values, max_value)
+    return values
 
-    if df.empty:
-        return results, 0, 0
 
-    last_year = int(df["tahun"].max())
-    start_year = last_year + 1
-    end_year = last_year + horizon
+def _split_stacked(df: pd.DataFrame) -> tuple[list[tuple[Any, Any, Any]], list[pd.Series], dict[str, int]]:
+    """Split a stacked (metric, kabkota) frame into series in a single groupby."""
+    keys: list[tuple[Any, Any, Any]] = []
+    series_list: list[pd.Series] = []
+    df = df.sort_values("tahun", kind="stable")
+    for key, group in df.groupby(["metric", "kode_kabupaten_kota", "nama_kabupaten_kota"], sort=True):
+        keys.append(key)
+        series_list.append(group["value"])
+    last_years = {str(metric): int(year) for metric, year in df.groupby("metric")["tahun"].max().items()}
+    return keys, series_list, last_years
 
-    for (kode, nama), group in df.groupby(["kode_kabupaten_kota", "nama_kabupaten_kota"]):
-        group = group.sort_values("tahun")
-        series = group[value_col]
+
+def _fit_series_list(series_list: list[pd.Series], horizon: int, method: str) -> list[tuple[SeriesForecast, str]]:
+    """Fit every series; returns each forecast with the method that produced it."""
+    if method == "holt_fast":
+        return [(forecast, method) for forecast in _forecast_batch_holt_fast(series_list, horizon)]
+
+    fitted: list[tuple[SeriesForecast, str]] = []
+    for series in series_list:
         try:
             if method == "holt":
-                preds = _forecast_series_holt(series, horizon)
+                fitted.append((_forecast_series_holt(series, horizon), method))
             elif method == "arima":
-                preds = _forecast_series_arima(series, horizon)
+                fitted.append((_forecast_series_arima(series, horizon), method))
             elif method == "linear":
-                preds = _forecast_series_linear(series, horizon)
+                fitted.append((_forecast_series_linear(series, horizon), method))
             else:
-                preds, _ = _forecast_series(series, horizon)
+                fitted.append(_forecast_series(series, horizon))
         except Exception:
-            preds, _ = _forecast_series(series, horizon)
+            fitted.append(_forecast_series(series, horizon))
+    return fitted
+
+
+def _fit_chunk(args: tuple[list[pd.Series], int, str]) -> list[tuple[SeriesForecast, str]]:
+    series_list, horizon, method = args
+    return _fit_series_list(series_list, horizon, method)
 
-        preds = _clip(preds, clip_min, clip_max)
-        for step, value in enumerate(preds, start=1):
+
+# Methods whose per-series fits are slow enough to be worth a process pool.
+PARALLEL_METHODS = {"auto", "holt", "arima"}
+
+_EXECUTOR: ProcessPoolExecutor | None = None
+_EXECUTOR_WORKERS = 0
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None or _EXECUTOR_WORKERS != workers:
+            if _EXECUTOR is not None:
+                _EXECUTOR.shutdown(wait=False)
+            _EXECUTOR = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _EXECUTOR_WORKERS = workers
+        return _EXECUTOR
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Forget ``executor`` (if still cached) so the next call starts a fresh pool."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is executor:
+            _EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_forecast_executor() -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+
+def fit_series_parallel(
+    series_list: list[pd.Series],
+    horizon: int,
+    method: str,
+    workers: int = 1,
+) -> list[tuple[SeriesForecast, str]]:
+    """Fit all series, spreading slow methods over ``workers`` processes in one map call.
+
+    If a pool worker has died (the pool is broken), the pool is replaced for
+    later calls and this call fits in-process.
+    """
+    if workers <= 1 or method not in PARALLEL_METHODS or len(series_list) < 2 * workers:
+        return _fit_series_list(series_list, horizon, method)
+
+    bounds = np.linspace(0, len(series_list), workers + 1).astype(int)
+    chunks = [(series_list[lo:hi], horizon, method) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+    executor = _get_executor(workers)
+    fitted: list[tuple[SeriesForecast, str]] = []
+    try:
+        for part in executor.map(_fit_chunk, chunks):
+            fitted.extend(part)
+    except BrokenProcessPool:
+        logger.warning("Forecast process pool is broken; fitting in-process and replacing the pool")
+        _discard_executor(executor)
+        return _fit_series_list(series_list, horizon, method)
+    return fitted
+
+
+def _forecast_arrays(forecasts: list[SeriesForecast]) -> tuple[np.ndarray, np.ndarray]:
+    """Stack point forecasts and their h-step standard errors into (series, step) arrays."""
+    values = np.array([f.values for f in forecasts], dtype=float)
+    sigma = np.array([f.sigma for f in forecasts], dtype=float)
+    factors = np.array([f.variance_factors for f in forecasts], dtype=float)
+    return values, sigma[:, None] * np.sqrt(factors)
+
+
+def _forecast_rows(
+    keys: list[tuple[Any, Any]],
+    values: np.ndarray,
+    std_error: np.ndarray,
+    last_year: int,
+    clip_min: float | None,
+    clip_max: float | None,
+    level: float,
+) -> list[dict[str, Any]]:
+    """Build forecast rows for all series, with intervals computed in one array pass."""
+    if not keys:
+        return []
+
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    half_width = z * std_error
+    lower = _clip_array(values - half_width, clip_min, clip_max)
+    upper = _clip_array(values + half_width, clip_min, clip_max)
+    values = _clip_array(values, clip_min, clip_max)
+    defined = np.isfinite(half_width)
+
+    results: list[dict[str, Any]] = []
+    for i, (kode, nama) in enumerate(keys):
+        for step in range(values.shape[1]):
             results.append(
                 {
-                    "tahun": last_year + step,
+                    "tahun": last_year + step + 1,
                     "kode_kabupaten_kota": int(kode),
                     "nama_kabupaten_kota": nama,
-                    "value": float(value),
+                    "value": float(values[i, step]),
+                    "lower": float(lower[i, step]) if defined[i, step] else None,
+                    "upper": float(upper[i, step]) if defined[i, step] else None,
                 }
             )
-
-    return results, start_year, end_year
+    return results
 
 
-def forecast_by_kabkota(
+def forecast_stacked(
     df: pd.DataFrame,
-    value_col: str,
     horizon: int,
-    clip_min: float | None = None,
-    clip_max: float | None = None,
-) -> tuple[list[dict[str, Any]], dict[str, int], int, int]:
-    results: list[dict[str, Any]] = []
-    method_counts = {"holt": 0, "linear": 0, "naive": 0}
+    method: str,
+    clip_bounds: dict[str, tuple[float | None, float | None]],
+    level: float = DEFAULT_INTERVAL_LEVEL,
+    workers: int = 1,
+) -> dict[str, dict[str, Any]]:
+    """Forecast every (metric, kabkota) series of a stacked frame in one pass.
+
+    ``df`` has columns metric, tahun, kode_kabupaten_kota, nama_kabupaten_kota
+    and value. Each metric keeps its own base year (its last observed year) and
+    clip bounds. Returns, per metric, its rows, method counts and year range.
+    """
+    results: dict[str, dict[str, Any]] = {}
+    for metric in clip_bounds:
+        results[metric] = {
+            "rows": [],
+            "method_counts": {"holt": 0, "linear": 0, "naive": 0},
+            "start_year": 0,
+            "end_year": 0,
+        }
+    if df.empty:
+        return results
+
+    keys, series_list, last_years = _split_stacked(df)
+    fitted = fit_series_parallel(series_list, horizon, method, workers)
+    values, std_error = _forecast_arrays([forecast for forecast, _ in fitted])
+
+    metric_of = np.array([str(key[0]) for key in keys])
+    for metric, last_year in last_years.items():
+        idx = np.flatnonzero(metric_of == metric)
+        clip_min, clip_max = clip_bounds.get(metric, (None, None))
+        counts = results[metric]["method_counts"]
+        for i in idx:
+            used = fitted[i][1]
+            counts[used] = counts.get(used, 0) + 1
+        results[metric].update(
+            rows=_forecast_rows(
+                [keys[i][1:] for i in idx],
+                values[idx],
+                std_error[idx],
+                last_year,
+                clip_min,
+                clip_max,
+                level,
+            ),
+            start_year=last_year + 1,
+            end_year=last_year + horizon,
+        )
+    return results
+
 
+def build_forecast_frame(
+    df: pd.DataFrame,
+    horizon: int,
+    method: str,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Unclipped forecasts and standard errors in long form for a stacked frame.
+
+    One row per metric, kabkota and step; the input is the same stacked frame
+    that ``forecast_stacked`` takes.
+    """
+    columns = ["metric", "kode_kabupaten_kota", "nama_kabupaten_kota", "step", "tahun", "value", "std_error"]
     if df.empty:
-        return results, method_counts, 0, 0
+        return pd.DataFrame(columns=columns)
+
+    keys, series_list, last_years = _split_stacked(df)
+    fitted = fit_series_parallel(series_list, horizon, method, workers)
+    values, std_error = _forecast_arrays([forecast for forecast, _ in fitted])
+
+    steps = np.arange(1, horizon + 1)
+    base_years = np.array([last_years[str(metric)] for metric, _, _ in keys])
+    return pd.DataFrame(
+        {
+            "metric": np.repeat([metric for metric, _, _ in keys], horizon),
+            "kode_kabupaten_kota": np.repeat([int(kode) for _, kode, _ in keys], horizon),
+            "nama_kabupaten_kota": np.repeat([nama for _, _, nama in keys], horizon),
+            "step": np.tile(steps, len(keys)),
+            "tahun": (base_years[:, None] + steps[None, :]).ravel(),
+            "value": values.ravel(),
+            "std_error": std_error.ravel(),
+        },
+        columns=columns,
+    )
 
-    last_year = int(df["tahun"].max())
-    start_year = last_year + 1
-    end_year = last_year + horizon
 
-    for (kode, nama), group in df.groupby(["kode_kabupaten_kota", "nama_kabupaten_kota"]):
-        group = group.sort_values("tahun")
-        preds, method = _forecast_series(group[value_col], horizon)
-        method_counts[method] = method_counts.get(method, 0) + 1
+def forecast_rows_from_frame(
+    frame: pd.DataFrame,
+    horizon: int,
+    clip_min: float | None = None,
+    clip_max: float | None = None,
+    level: float = DEFAULT_INTERVAL_LEVEL,
+) -> tuple[list[dict[str, Any]], int, int]:
+    """Serve forecast rows from a frame produced by ``build_forecast_frame``."""
+    frame = frame[frame["step"] <= horizon].sort_values(
+        ["kode_kabupaten_kota", "nama_kabupaten_kota", "step"]
+    )
+    if frame.empty:
+        return [], 0, 0
 
-        preds = _clip(preds, clip_min, clip_max)
-        for step, value in enumerate(preds, start=1):
-            results.append(
-                {
-                    "tahun": last_year + step,
-                    "kode_kabupaten_kota": int(kode),
-                    "nama_kabupaten_kota": nama,
-                    "value": float(value),
-                }
-            )
+    last_year = int(frame["tahun"].min()) - 1
+    keys = list(frame[["kode_kabupaten_kota", "nama_kabupaten_kota"]].drop_duplicates().itertuples(index=False, name=None))
+    values = frame["value"].to_numpy(dtype=float).reshape(len(keys), horizon)
+    std_error = frame["std_error"].to_numpy(dtype=float).reshape(len(keys), horizon)
 
-    return results, method_counts, start_year, end_year
+    results = _forecast_rows(keys, values, std_error, last_year, clip_min, clip_max, level)
+    return results, last_year + 1, last_year + horizon
 
 
 def _predict_series(values: pd.Series, horizon: int, method: str) -> list[float]:
     if method == "holt":
-        return _forecast_series_holt(values, horizon)
+        return _forecast_series_holt(values, horizon).values
+    if method == "holt_fast":
+        return _forecast_batch_holt_fast([values], horizon)[0].values
     if method == "arima":
-        return _forecast_series_arima(values, horizon)
+        return _forecast_series_arima(values, horizon).values
     if method == "linear":
-        return _forecast_series_linear(values, horizon)
-    preds, _ = _forecast_series(values, horizon)
-    return preds
+        return _forecast_series_linear(values, horizon).values
+    forecast, _ = _forecast_series(values, horizon)
+    return forecast.values
 
 
 def compare_methods_by_kabkota(
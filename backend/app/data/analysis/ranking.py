@@ -0,0 +1,174 @@
+from typing import Any
+
+import numpy as np
+
+# Rank tables are built once per data version from a metric's kabkota x year
+# pivot (see kabkota_matrix): for every year the rows in descending value
+# order and each row's rank (1 = largest; equal values share the best rank;
+# NaN where the row has no value), plus the rank change from the previous
+# year. Ranks are province-wide; tipe/kabkota filters only select rows.
+# Top/bottom-K queries select with argpartition and sort only the K rows.
+
+
+def build_rank_table(matrix: dict[str, Any]) -> dict[str, Any]:
+    """``matrix`` plus per-year ``order``, ``ranks``, ``rank_changes`` and ``counts``."""
+    values = matrix["values"]
+    missing = np.isnan(values)
+    n_rows, n_years = values.shape
+
+    # Missing values sort last; ties keep dim_kabupaten order.
+    keyed = np.where(missing, np.inf, -values)
+    order = np.argsort(keyed, axis=0, kind="stable")
+    columns = np.arange(n_years)
+
+    sorted_keys = keyed[order, columns]
+    starts = np.ones(sorted_keys.shape, dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    positions = np.arange(n_rows)[:, None]
+    competition = np.maximum.accumulate(np.where(starts, positions, 0), axis=0) + 1
+
+    ranks = np.empty(values.shape)
+    ranks[order, columns] = competition
+    ranks[missing] = np.nan
+
+    rank_changes = np.full(values.shape, np.nan)
+    # Positive = moved up (towards rank 1) since the previous year.
+    rank_changes[:, 1:] = ranks[:, :-1] - ranks[:, 1:]
+
+    return {
+        **matrix,
+        "order": order,
+        "ranks": ranks,
+        "rank_changes": rank_changes,
+        "counts": (~missing).sum(axis=0),
+    }
+
+
+def year_column(table: dict[str, Any], year: int) -> int | None:
+    """Column of ``year`` in the table, None when the metric has no data for it."""
+    years = table["years"]
+    column = int(np.searchsorted(years, year))
+    if column < years.size and years[column] == year:
+        return column
+    return None
+
+
+def top_k_indices(scores: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """Indices of the ``k`` largest (or smallest) finite scores, best first.
+
+    Equal scores keep index order, including at the K-th place.
+    """
+    candidates = np.flatnonzero(np.isfinite(scores))
+    keyed = -scores[candidates] if largest else scores[candidates]
+    if 0 < k < candidates.size:
+        kth = np.partition(keyed, k - 1)[k - 1]
+        better = keyed < kth
+        tied = np.flatnonzero(keyed == kth)[: k - int(better.sum())]
+        selected = np.concatenate([np.flatnonzero(better), tied])
+    elif k <= 0:
+        selected = np.array([], dtype=np.intp)
+    else:
+        selected = np.arange(candidates.size)
+    selected = selected[np.lexsort((selected, keyed[selected]))]
+    return candidates[selected]
+
+
+def _cast(value: float, integer: bool) -> Any:
+    if np.isnan(value):
+        return None
+    return int(value) if integer else float(value)
+
+
+def _row(table: dict[str, Any], row: int) -> dict[str, Any]:
+    return {
+        "kode_kabupaten_kota": int(table["kode_kabupaten_kota"][row]),
+        "nama_kabupaten_kota": str(table["nama_kabupaten_kota"][row]),
+    }
+
+
+def ranked_values(table: dict[str, Any], year: int, row_mask: np.ndarray) -> list[dict[str, Any]]:
+    """Rows with a value in ``year``, largest first."""
+    column = year_column(table, year)
+    if column is None:
+        return []
+    order = table["order"][: table["counts"][column], column]
+    order = order[row_mask[order]]
+    values = table["values"][:, column]
+    return [{**_row(table, row), "value": _cast(values[row], table["integer"])} for row in order]
+
+
+def _pair_columns(table: dict[str, Any], year_a: int, year_b: int) -> tuple[int, int] | None:
+    column_a, column_b = year_column(table, year_a), year_column(table, year_b)
+    if column_a is None or column_b is None:
+        return None
+    return column_a, column_b
+
+
+def compute_rank_movers(
+    table: dict[str, Any],
+    start: int,
+    end: int,
+    row_mask: np.ndarray,
+    k: int,
+) -> dict[str, Any]:
+    """The ``k`` rows whose rank rose (climbers) and fell (fallers) most from start to end."""
+    columns = _pair_columns(table, start, end)
+    if columns is None:
+        return {"climbers": [], "fallers": []}
+    column_a, column_b = columns
+    ranks, values, integer = table["ranks"], table["values"], table["integer"]
+    change = np.where(row_mask, ranks[:, column_a] - ranks[:, column_b], np.nan)
+
+    def records(rows: np.ndarray) -> list[dict[str, Any]]:
+        return [
+            {
+                **_row(table, row),
+                "rank_start": int(ranks[row, column_a]),
+                "rank_end": int(ranks[row, column_b]),
+                "rank_change": int(change[row]),
+                "value_start": _cast(values[row, column_a], integer),
+                "value_end": _cast(values[row, column_b], integer),
+            }
+            for row in rows
+        ]
+
+    climbing = np.where(change > 0, change, np.nan)
+    falling = np.where(change < 0, change, np.nan)
+    return {
+        "climbers": records(top_k_indices(climbing, k, largest=True)),
+        "fallers": records(top_k_indices(falling, k, largest=False)),
+    }
+
+
+def compute_top_delta(
+    table: dict[str, Any],
+    year_a: int,
+    year_b: int,
+    row_mask: np.ndarray,
+    k: int,
+) -> dict[str, Any]:
+    """The ``k`` largest increases and decreases of the value from year_a to year_b."""
+    columns = _pair_columns(table, year_a, year_b)
+    if columns is None:
+        return {"increase": [], "decrease": []}
+    column_a, column_b = columns
+    ranks, values, integer = table["ranks"], table["values"], table["integer"]
+    delta = np.where(row_mask, values[:, column_b] - values[:, column_a], np.nan)
+
+    def records(rows: np.ndarray) -> list[dict[str, Any]]:
+        return [
+            {
+                **_row(table, row),
+                "value_a": _cast(values[row, column_a], integer),
+                "value_b": _cast(values[row, column_b], integer),
+                "delta": _cast(delta[row], integer),
+                "rank_a": int(ranks[row, column_a]),
+                "rank_b": int(ranks[row, column_b]),
+            }
+            for row in rows
+        ]
+
+    return {
+        "increase": records(top_k_indices(np.where(delta > 0, delta, np.nan), k, largest=True)),
+        "decrease": records(top_k_indices(np.where(delta < 0, delta, np.nan), k, largest=False)),
+    }
@@ -1,37 +1,109 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 
+from app.data.analysis.kabkota_index import KabkotaIndex
+from app.data.analysis.ols import ols_by_group, ols_record, within_transform
 
-def compute_regression(
+
+def _merge_range(
     df_pkh: pd.DataFrame,
     df_persen: pd.DataFrame,
     start: int,
     end: int,
-) -> dict[str, Any]:
+    dim_kabupaten: pd.DataFrame,
+) -> pd.DataFrame:
+    index = KabkotaIndex(dim_kabupaten)
     pkh_range = df_pkh[(df_pkh["tahun"] >= start) & (df_pkh["tahun"] <= end)]
     persen_range = df_persen[(df_persen["tahun"] >= start) & (df_persen["tahun"] <= end)]
 
-    merged = pkh_range.merge(
-        persen_range,
-        on=["kode_kabupaten_kota", "nama_kabupaten_kota", "tahun"],
-        how="inner",
+    merged = index.join(
+        pkh_range[["kode_kabupaten_kota", "tahun", "jumlah_penerima_manfaat"]],
+        [(persen_range, ["persentase_penduduk_miskin"])],
+        years=(start, end),
     ).dropna(subset=["jumlah_penerima_manfaat", "persentase_penduduk_miskin"])
+    return index.with_names(merged)
+
+
+def compute_regression(
+    df_pkh: pd.DataFrame,
+    df_persen: pd.DataFrame,
+    start: int,
+    end: int,
+    dim_kabupaten: pd.DataFrame,
+) -> dict[str, Any]:
+    merged = _merge_range(df_pkh, df_persen, start, end, dim_kabupaten)
 
     if merged.empty:
         return {"n": 0, "intercept": None, "slope": None, "r2": None, "p_value": None}
 
-    x = merged["jumlah_penerima_manfaat"].astype(float)
-    y = merged["persentase_penduduk_miskin"].astype(float)
-    x_const = sm.add_constant(x)
-
-    model = sm.OLS(y, x_const).fit()
+    fit = ols_by_group(
+        merged["jumlah_penerima_manfaat"].to_numpy(dtype=float),
+        merged["persentase_penduduk_miskin"].to_numpy(dtype=float),
+        np.zeros(len(merged), dtype=np.intp),
+        1,
+    )
+    record = ols_record(fit, 0)
 
     return {
-        "n": int(len(merged)),
-        "intercept": float(model.params["const"]),
-        "slope": float(model.params["jumlah_penerima_manfaat"]),
-        "r2": float(model.rsquared),
-        "p_value": float(model.pvalues["jumlah_penerima_manfaat"]),
+        "n": record["n"],
+        "intercept": record["intercept"],
+        "slope": record["slope"],
+        "r2": record["r2"],
+        "p_value": record["p_value"],
     }
+
+
+def compute_regression_grid(
+    df_pkh: pd.DataFrame,
+    df_persen: pd.DataFrame,
+    start: int,
+    end: int,
+    dim_kabupaten: pd.DataFrame,
+) -> list[dict[str, Any]]:
+    """Fit every specification (pooled, per year, per tipe, kabkota FE) in two kernel calls."""
+    merged = _merge_range(df_pkh, df_persen, start, end, dim_kabupaten)
+    if merged.empty:
+        return []
+
+    x = merged["jumlah_penerima_manfaat"].to_numpy(dtype=float)
+    y = merged["persentase_penduduk_miskin"].to_numpy(dtype=float)
+    rows = np.arange(len(merged))
+
+    year_codes, years = pd.factorize(merged["tahun"], sort=True)
+    tipe = np.where(merged["nama_kabupaten_kota"].str.startswith("KOTA "), "kota", "kabupaten")
+    tipe_codes, tipes = pd.factorize(tipe, sort=True)
+
+    specs: list[tuple[str, Any]] = [("pooled", None)]
+    specs += [("tahun", int(year)) for year in years]
+    specs += [("tipe", str(value)) for value in tipes]
+
+    year_offset = 1
+    tipe_offset = year_offset + len(years)
+    index = np.concatenate([rows, rows, rows])
+    group_ids = np.concatenate(
+        [
+            np.zeros(len(rows), dtype=np.intp),
+            year_offset + year_codes,
+            tipe_offset + tipe_codes,
+        ]
+    )
+    fit = ols_by_group(x[index], y[index], group_ids, len(specs))
+
+    results = [
+        {"spec": spec, "group": group, **ols_record(fit, i)}
+        for i, (spec, group) in enumerate(specs)
+    ]
+
+    entity_ids, entities = pd.factorize(merged["kode_kabupaten_kota"])
+    fe_fit = ols_by_group(
+        within_transform(x, entity_ids),
+        within_transform(y, entity_ids),
+        np.zeros(len(rows), dtype=np.intp),
+        1,
+        n_absorbed=np.array([len(entities)]),
+    )
+    results.append({"spec": "fe_kabkota", "group": None, **ols_record(fe_fit, 0)})
+
+    return results
@@ -2,25 +2,28 @@ from typing import Any
 
 import pandas as pd
 
+from app.data.analysis.kabkota_index import KabkotaIndex
+
 
 def compute_scatter(
     df_pkh: pd.DataFrame,
     df_persen: pd.DataFrame,
     year: int,
+    dim_kabupaten: pd.DataFrame,
 ) -> list[dict[str, Any]]:
+    index = KabkotaIndex(dim_kabupaten)
     pkh_year = df_pkh[df_pkh["tahun"] == year]
     persen_year = df_persen[df_persen["tahun"] == year]
 
-    merged = pkh_year.merge(
-        persen_year,
-        on=["kode_kabupaten_kota", "nama_kabupaten_kota", "tahun"],
-        how="inner",
+    merged = index.join(
+        pkh_year[["kode_kabupaten_kota", "jumlah_penerima_manfaat"]],
+        [(persen_year, ["persentase_penduduk_miskin"])],
     )
 
     if merged.empty:
         return []
 
-    return merged[
+    return index.with_names(merged)[
         [
             "kode_kabupaten_kota",
             "nama_kabupaten_kota",
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Global Moran's I and local Moran (LISA) on row-standardized contiguity
+# weights (see app.data.geometry), over the kabupaten/kota that have a value.
+# Spatial lags are sparse matrix-vector products. Significance comes from
+# permutation tests run as array operations in blocks of permutations, so
+# memory stays bounded (about PERMUTATION_BLOCK_VALUES floats) as regions
+# grow. A fixed seed keeps results (and their cached responses) reproducible.
+PERMUTATION_SEED = 12345
+PERMUTATION_BLOCK_VALUES = 4_000_000
+
+QUADRANTS = {1: "HH", 2: "LH", 3: "LL", 4: "HL"}
+
+
+def _row_standardize(weights: sparse.csr_matrix) -> sparse.csr_matrix:
+    from scipy import sparse
+
+    sums = np.asarray(weights.sum(axis=1)).ravel()
+    scale = np.divide(1.0, sums, out=np.zeros_like(sums), where=sums > 0)
+    return (sparse.diags(scale) @ weights).tocsr()
+
+
+def _prepare(values: np.ndarray, weights: sparse.csr_matrix) -> tuple[np.ndarray, sparse.csr_matrix, np.ndarray]:
+    known = np.isfinite(values)
+    w = _row_standardize(weights[known][:, known])
+    z = values[known] - values[known].mean() if known.any() else values[known]
+    return known, w, z
+
+
+def _pseudo_p(observed: np.ndarray, simulated: np.ndarray) -> np.ndarray:
+    """One-sided permutation p-value, in the direction of the observed statistic."""
+    permutations = simulated.shape[0]
+    larger = (simulated >= observed).sum(axis=0)
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1) / (permutations + 1)
+
+
+def _blocks(permutations: int, values_per_permutation: int):
+    size = max(1, PERMUTATION_BLOCK_VALUES // max(values_per_permutation, 1))
+    for start in range(0, permutations, size):
+        yield slice(start, min(start + size, permutations))
+
+
+def _float(value: float) -> float | None:
+    return None if not np.isfinite(value) else float(value)
+
+
+def _sample_distinct(rng: np.random.Generator, shape: tuple[int, ...], population: int, k: int) -> np.ndarray:
+    """``k`` distinct ints from [0, population) per cell of ``shape``, in random order.
+
+    Floyd's algorithm picks a uniform k-subset with one draw per element (no
+    n-wide keys); shuffling it makes every ordering equally likely, so the
+    first k_i entries are a uniform sample of k_i.
+    """
+    picks = np.empty((k,) + shape, dtype=np.intp)
+    for j, top in enumerate(range(population - k, population)):
+        draw = rng.integers(0, top + 1, size=shape)
+        seen = np.zeros(shape, dtype=bool)
+        for previous in picks[:j]:
+            seen |= previous == draw
+        picks[j] = np.where(seen, top, draw)
+    return rng.permuted(np.moveaxis(picks, 0, -1), axis=-1)
+
+
+def compute_moran(values: np.ndarray, weights: sparse.csr_matrix, permutations: int) -> dict[str, Any]:
+    """Global Moran's I of ``values`` with a permutation test."""
+    known, w, z = _prepare(values, weights)
+    n = int(z.size)
+    islands = int((np.diff(w.indptr) == 0).sum())
+    result: dict[str, Any] = {
+        "n": n,
+        "islands": islands,
+        "permutations": permutations,
+        "i": None,
+        "expected_i": -1.0 / (n - 1) if n > 1 else None,
+        "mean_sim": None,
+        "std_sim": None,
+        "z_sim": None,
+        "p_sim": None,
+    }
+    total = z @ z
+    s0 = w.sum()
+    if n < 3 or not total > 0 or not s0 > 0:
+        return result
+
+    scale = n / s0 / total
+    observed = scale * (z @ (w @ z))
+
+    rng = np.random.default_rng(PERMUTATION_SEED)
+    simulated = np.empty(permutations)
+    for block in _blocks(permutations, n):
+        shuffled = rng.permuted(np.tile(z, (block.stop - block.start, 1)), axis=1)
+        lags = (w @ shuffled.T).T
+        simulated[block] = scale * np.einsum("ij,ij->i", shuffled, lags)
+
+    std = simulated.std()
+    result.update(
+        i=float(observed),
+        mean_sim=float(simulated.mean()),
+        std_sim=float(std),
+        z_sim=_float((observed - simulated.mean()) / std) if std > 0 else None,
+        p_sim=float(_pseudo_p(np.array([observed]), simulated[:, None])[0]),
+    )
+    return result
+
+
+def compute_lisa(
+    values: np.ndarray,
+    weights: sparse.csr_matrix,
+    permutations: int,
+) -> dict[str, np.ndarray]:
+    """Local Moran's I per region, with conditional permutation p-values.
+
+    Arrays follow the rows of ``values``; rows without a value are NaN
+    (quadrant 0). For each region, its neighbours' values are replaced by
+    values drawn without replacement from the other regions: k_max draws per
+    region and permutation, so the cost grows with n * k_max rather than n**2.
+    quadrant is 1-4 (HH, LH, LL, HL: own value, neighbours' average);
+    lisa_records turns it into a cluster for a significance level.
+    """
+    known, w, z = _prepare(values, weights)
+    n = int(z.size)
+    rows = values.size
+    local_i = np.full(rows, np.nan)
+    lag_values = np.full(rows, np.nan)
+    p_sim = np.full(rows, np.nan)
+    neighbors = np.zeros(rows, dtype=np.int64)
+    quadrant = np.zeros(rows, dtype=np.int64)
+
+    counts = np.diff(w.indptr)
+    neighbors[known] = counts
+    m2 = (z @ z) / n if n else 0.0
+    if n < 3 or not m2 > 0:
+        return {"local_i": local_i, "lag": lag_values, "p_sim": p_sim, "neighbors": neighbors, "quadrant": quadrant}
+
+    lag = w @ z
+    observed = z / m2 * lag
+    local_i[known] = observed
+    lag_values[known] = lag + values[known].mean()
+
+    # Neighbour weights per region, left-aligned and zero-padded to k_max.
+    k_max = min(int(counts.max()), n - 1)
+    padded = np.zeros((n, max(k_max, 1)))
+    offsets = np.arange(w.nnz) - np.repeat(w.indptr[:-1], counts)
+    padded[np.repeat(np.arange(n), counts), offsets] = w.data
+
+    rng = np.random.default_rng(PERMUTATION_SEED)
+    simulated = np.zeros((permutations, n))
+    if k_max:
+        regions = np.arange(n)[None, :, None]
+        for block in _blocks(permutations, n * k_max):
+            # Draws index the n - 1 other regions; skip each region itself.
+            picked = _sample_distinct(rng, (block.stop - block.start, n), n - 1, k_max)
+            picked += picked >= regions
+            simulated[block] = z / m2 * (z[picked] * padded[None, :, :k_max]).sum(axis=2)
+
+    p_sim[known] = np.where(counts > 0, _pseudo_p(observed, simulated), np.nan)
+    quadrant[known] = np.where(z > 0, np.where(lag > 0, 1, 4), np.where(lag > 0, 2, 3))
+    return {"local_i": local_i, "lag": lag_values, "p_sim": p_sim, "neighbors": neighbors, "quadrant": quadrant}
+
+
+def lisa_records(
+    matrix: dict[str, Any],
+    values: np.ndarray,
+    lisa: dict[str, np.ndarray],
+    row_mask: np.ndarray,
+    significance: float,
+) -> list[dict[str, Any]]:
+    """One record per kabupaten/kota in ``row_mask``, in matrix row order.
+
+    cluster is the quadrant where p_sim <= significance, otherwise "ns"; None
+    for rows without a value.
+    """
+    cast = int if matrix["integer"] else float
+    significant = lisa["p_sim"] <= significance
+
+    def cluster(row: int) -> str | None:
+        quadrant = int(lisa["quadrant"][row])
+        if not quadrant:
+            return None
+        return QUADRANTS[quadrant] if significant[row] else "ns"
+
+    return [
+        {
+            "kode_kabupaten_kota": int(matrix["kode_kabupaten_kota"][row]),
+            "nama_kabupaten_kota": str(matrix["nama_kabupaten_kota"][row]),
+            "value": None if np.isnan(values[row]) else cast(values[row]),
+            "lag": _float(lisa["lag"][row]),
+            "local_i": _float(lisa["local_i"][row]),
+            "p_sim": _float(lisa["p_sim"][row]),
+            "neighbors": int(lisa["neighbors"][row]),
+            "cluster": cluster(row),
+        }
+        for row in np.flatnonzero(row_mask)
+    ]
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.data.analysis.predictive import build_forecast_frame
+from app.data.metrics import METRICS, stack_metric_frames
+from app.data.paths import PROCESSED_ARTIFACTS, resolve_processed_path
+from app.data.version import get_data_version
+
+logger = get_logger(__name__)
+
+FORECAST_METHODS = ("auto", "holt", "holt_fast", "arima", "linear")
+FORECAST_MAX_HORIZON = 10
+
+# Bump when the forecasting code changes so stored tables are treated as stale.
+FORECAST_TABLE_REVISION = 2
+
+_LOADED: dict[str, Dict[tuple[str, str], pd.DataFrame]] = {}
+_LOAD_LOCK = threading.Lock()
+_REBUILD_THREAD: threading.Thread | None = None
+# Held for every build (build_fact_tables and background rebuilds alike), so
+# two builds never run side by side on the same table.
+_BUILD_LOCK = threading.Lock()
+# data_version stored in a table file, by (path, size, mtime_ns): a stale
+# table is recognized without re-reading it until the file changes.
+_STORED_VERSIONS: dict[tuple[str, int, int], str] = {}
+
+
+def forecast_table_version(data_version: str) -> str:
+    return f"{data_version}-r{FORECAST_TABLE_REVISION}"
+
+
+def _forecast_path(processed_dir: str) -> Path:
+    return resolve_processed_path(processed_dir, PROCESSED_ARTIFACTS["fact_forecast"])
+
+
+def build_forecast_table(
+    tables: Dict[str, pd.DataFrame],
+    processed_dir: str | None = None,
+) -> pd.DataFrame:
+    """Precompute every metric x method x kabkota forecast up to the max horizon."""
+    with _BUILD_LOCK:
+        return _build_forecast_table(tables, processed_dir)
+
+
+def _build_forecast_table(
+    tables: Dict[str, pd.DataFrame],
+    processed_dir: str | None = None,
+) -> pd.DataFrame:
+    settings = get_settings()
+    base_dir = processed_dir or settings.data_dir_processed
+    version = forecast_table_version(get_data_version(base_dir))
+
+    stacked = stack_metric_frames({key: tables[spec.table] for key, spec in METRICS.items()})
+    last_observed = (
+        stacked.groupby(["metric", "kode_kabupaten_kota"])["tahun"]
+        .max()
+        .rename("last_observed_year")
+        .reset_index()
+    )
+
+    frames = []
+    for method in FORECAST_METHODS:
+        frame = build_forecast_frame(stacked, FORECAST_MAX_HORIZON, method, settings.resolved_forecast_workers)
+        frame.insert(1, "method", method)
+        frames.append(frame)
+
+    table = pd.concat(frames, ignore_index=True).merge(
+        last_observed, on=["metric", "kode_kabupaten_kota"], how="left"
+    )
+    table["data_version"] = version
+
+    path = _forecast_path(base_dir)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as handle:
+        tmp_path = Path(handle.name)
+    try:
+        table.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    logger.info("Forecast table (%s rows) saved to %s", len(table), path)
+    return table
+
+
+def get_forecast_frames(processed_dir: str | None = None) -> Dict[tuple[str, str], pd.DataFrame] | None:
+    """Stored forecasts split by (metric, method), or None when missing or stale."""
+    settings = get_settings()
+    base_dir = processed_dir or settings.data_dir_processed
+    version = forecast_table_version(get_data_version(base_dir))
+
+    with _LOAD_LOCK:
+        frames = _LOADED.get(base_dir + ":" + version)
+    if frames is not None:
+        return frames
+
+    path = _forecast_path(base_dir)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    file_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _LOAD_LOCK:
+        stored = _STORED_VERSIONS.get(file_key)
+    if stored is not None and stored != version:
+        return None
+
+    table = pd.read_csv(path)
+    stored = str(table["data_version"].iloc[0]) if not table.empty else ""
+    with _LOAD_LOCK:
+        _STORED_VERSIONS.clear()
+        _STORED_VERSIONS[file_key] = stored
+    if stored != version:
+        return None
+
+    frames = {
+        (metric, method): group.drop(columns=["metric", "method", "data_version"]).reset_index(drop=True)
+        for (metric, method), group in table.groupby(["metric", "method"])
+    }
+    with _LOAD_LOCK:
+        _LOADED.clear()
+        _LOADED[base_dir + ":" + version] = frames
+    return frames
+
+
+def schedule_forecast_rebuild(processed_dir: str | None = None) -> threading.Thread:
+    """Rebuild the forecast table in the background (at most one rebuild at a time)."""
+    global _REBUILD_THREAD
+    with _LOAD_LOCK:
+        if _REBUILD_THREAD is not None and _REBUILD_THREAD.is_alive():
+            return _REBUILD_THREAD
+
+        def _run() -> None:
+            from app.data.transform import load_processed_tables
+
+            try:
+                with _BUILD_LOCK:
+                    # A build that held the lock meanwhile may have made the
+                    # table current already.
+                    if get_forecast_frames(processed_dir) is None:
+                        _build_forecast_table(load_processed_tables(processed_dir), processed_dir)
+            except Exception:
+                logger.exception("Forecast table rebuild failed")
+
+        _REBUILD_THREAD = threading.Thread(target=_run, name="forecast-rebuild", daemon=True)
+        _REBUILD_THREAD.start()
+        return _REBUILD_THREAD
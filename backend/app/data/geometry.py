@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+logger = get_logger(__name__)
+
+# Queen contiguity: two kabupaten/kota are neighbours when their boundaries
+# share at least one vertex. Neighbouring polygons in the boundary file are
+# cut from the same border lines, so shared borders carry identical vertices;
+# coordinates are rounded to VERTEX_DECIMALS (about 1 cm) before matching.
+# With V the (vertex x region) incidence matrix, V.T @ V counts the vertices
+# each pair of regions shares, so the weights come out sparse directly.
+VERTEX_DECIMALS = 7
+
+
+def _feature_code(properties: dict[str, Any]) -> int | None:
+    digits = str(properties.get("KDPKAB") or "").replace(".", "")
+    return int(digits) if digits.isdigit() else None
+
+
+def _rings(geometry: dict[str, Any]) -> list[list[list[float]]]:
+    if geometry["type"] == "Polygon":
+        return list(geometry["coordinates"])
+    if geometry["type"] == "MultiPolygon":
+        return [ring for polygon in geometry["coordinates"] for ring in polygon]
+    return []
+
+
+def load_kabkota_boundaries(path: Path, province_code: int) -> dict[int, np.ndarray]:
+    """Boundary vertices (lon, lat) per kode_kabupaten_kota in ``province_code``.
+
+    Features without a geometry are skipped.
+    """
+    collection = json.loads(path.read_text(encoding="utf-8"))
+    rings: dict[int, list[np.ndarray]] = {}
+    for feature in collection.get("features", []):
+        properties = feature.get("properties") or {}
+        geometry = feature.get("geometry")
+        code = _feature_code(properties)
+        if geometry is None or code is None or str(properties.get("KDPPUM")) != str(province_code):
+            continue
+        rings.setdefault(code, []).extend(np.asarray(ring, dtype=float)[:, :2] for ring in _rings(geometry) if ring)
+    return {code: np.concatenate(parts) for code, parts in rings.items() if parts}
+
+
+def contiguity_weights(boundaries: dict[int, np.ndarray]) -> dict[str, Any]:
+    """Binary queen contiguity (CSR), rows and columns in ascending code order."""
+    from scipy import sparse
+
+    codes = np.array(sorted(boundaries), dtype=np.int64)
+    if not codes.size:
+        return {"codes": codes, "weights": sparse.csr_matrix((0, 0))}
+
+    points = np.round(np.concatenate([boundaries[code] for code in codes]), VERTEX_DECIMALS)
+    owners = np.repeat(np.arange(codes.size), [len(boundaries[code]) for code in codes])
+    _, vertex_ids = np.unique(points, axis=0, return_inverse=True)
+    vertex_ids = vertex_ids.ravel()
+
+    incidence = sparse.csr_matrix(
+        (np.ones(owners.size), (vertex_ids, owners)),
+        shape=(int(vertex_ids.max()) + 1, codes.size),
+    )
+    incidence.data[:] = 1.0
+    weights = (incidence.T @ incidence).tocsr()
+    weights.setdiag(0)
+    weights.eliminate_zeros()
+    weights.data[:] = 1.0
+
+    logger.info(
+        "Built contiguity weights",
+        extra={"regions": int(codes.size), "links": int(weights.nnz // 2)},
+    )
+    return {"codes": codes, "weights": weights}
+
+
+def align_weights(weights: dict[str, Any], codes: np.ndarray) -> sparse.csr_matrix:
+    """The weights between ``codes``, in that order; codes without geometry get no neighbours."""
+    from scipy import sparse
+
+    lookup = {int(code): position for position, code in enumerate(weights["codes"])}
+    source = np.array([lookup.get(int(code), -1) for code in codes], dtype=np.intp)
+    found = np.flatnonzero(source >= 0)
+    select = sparse.csr_matrix(
+        (np.ones(found.size), (found, source[found])),
+        shape=(len(codes), len(weights["codes"])),
+    )
+    return (select @ weights["weights"] @ select.T).tocsr()
@@ -1,13 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator
 
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 
 from app.core.config import get_settings
+from app.data.normalize import filter_jabar, normalize_common
 from app.data.paths import DATASET_FILES, resolve_source_path
+from app.data.validate import REQUIRED_COLUMNS, TEXT_COLUMNS, validate_dataset
 
+# Source files are read in chunks of ingest_chunk_rows, restricted to the
+# required columns. Each chunk is normalized and filtered to Jawa Barat (and,
+# for the kabupaten/kota datasets, the configured year range) before the next
+# one is read, so memory follows the chunk size and the Jabar rows, not the
+# size of a national extract.
 
-def load_source_datasets(source_dir: str | None = None) -> Dict[str, pd.DataFrame]:
+YEAR_FILTERED_DATASETS = {"kemiskinan_persen", "pkh", "kemiskinan_abs"}
+
+
+def _read_options(dataset_key: str) -> dict:
+    columns = REQUIRED_COLUMNS[dataset_key]
+    return {
+        "usecols": sorted(columns),
+        "dtype": {col: str for col in columns & TEXT_COLUMNS},
+    }
+
+
+def _coerce_numeric(chunk: pd.DataFrame, columns: set[str]) -> pd.DataFrame:
+    for col in columns:
+        # Clean columns are already parsed by the reader; only chunks with
+        # stray values fall back to a (coercing) second parse.
+        if not is_numeric_dtype(chunk[col]):
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+    return chunk
+
+
+def _prepare_chunk(chunk: pd.DataFrame, dataset_key: str) -> pd.DataFrame:
+    settings = get_settings()
+    chunk = _coerce_numeric(chunk, REQUIRED_COLUMNS[dataset_key] - TEXT_COLUMNS)
+    chunk = filter_jabar(normalize_common(chunk))
+    if dataset_key in YEAR_FILTERED_DATASETS:
+        chunk = chunk[chunk["tahun"].between(settings.default_start_year, settings.default_end_year)]
+    return chunk
+
+
+def iter_source_chunks(path: Path, dataset_key: str, chunksize: int | None = None) -> Iterator[pd.DataFrame]:
+    validate_dataset(pd.read_csv(path, nrows=0), dataset_key)
+    chunksize = chunksize or get_settings().ingest_chunk_rows
+    with pd.read_csv(path, chunksize=chunksize, **_read_options(dataset_key)) as reader:
+        for chunk in reader:
+            yield _prepare_chunk(chunk, dataset_key)
+
+
+def load_source_dataset(path: Path, dataset_key: str, chunksize: int | None = None) -> pd.DataFrame:
+    chunks = [chunk for chunk in iter_source_chunks(path, dataset_key, chunksize) if not chunk.empty]
+    if not chunks:
+        return _prepare_chunk(pd.read_csv(path, nrows=0, **_read_options(dataset_key)), dataset_key)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_source_datasets(source_dir: str | None = None, chunksize: int | None = None) -> Dict[str, pd.DataFrame]:
     settings = get_settings()
     base_dir = source_dir or settings.source_data_dir
     base_path = Path(base_dir)
@@ -15,11 +68,15 @@ def load_source_datasets(source_dir: str | None = None) -> Dict[str, pd.DataFram
     if not base_path.exists():
         raise FileNotFoundError(f"Source data dir not found: {base_dir}")
 
-    datasets: Dict[str, pd.DataFrame] = {}
+    paths: Dict[str, Path] = {}
     for key, filename in DATASET_FILES.items():
         path = resolve_source_path(base_dir, filename)
         if not path.exists():
             raise FileNotFoundError(f"Missing dataset: {path}")
-        datasets[key] = pd.read_csv(path)
+        paths[key] = path
 
-    return datasets
+    # The datasets are independent; the CSV parser releases the GIL, so they
+    # are read and normalized side by side.
+    with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="ingest") as pool:
+        futures = {key: pool.submit(load_source_dataset, path, key, chunksize) for key, path in paths.items()}
+        return {key: future.result() for key, future in futures.items()}
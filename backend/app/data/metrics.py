@@ -0,0 +1,39 @@
+from typing import NamedTuple
+
+import pandas as pd
+
+
+class MetricSpec(NamedTuple):
+    key: str
+    table: str
+    value_col: str
+    clip_min: float | None
+    clip_max: float | None
+    unit: str
+
+
+METRICS: dict[str, MetricSpec] = {
+    "pkh": MetricSpec("pkh", "fact_pkh", "jumlah_penerima_manfaat", 0.0, None, "keluarga"),
+    "kemiskinan": MetricSpec(
+        "kemiskinan", "fact_kemiskinan_persen", "persentase_penduduk_miskin", 0.0, 100.0, "persen"
+    ),
+    "kemiskinan_abs": MetricSpec(
+        "kemiskinan_abs", "fact_kemiskinan_abs", "jumlah_penduduk_miskin", 0.0, None, "ribu jiwa"
+    ),
+}
+
+
+def stack_metric_frames(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Stack per-metric fact tables into one long frame with a shared ``value`` column."""
+    parts = []
+    for key, df in frames.items():
+        spec = METRICS[key]
+        part = df[["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", spec.value_col]].rename(
+            columns={spec.value_col: "value"}
+        )
+        part.insert(0, "metric", key)
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=["metric", "tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "value"])
+    return pd.concat(parts, ignore_index=True)
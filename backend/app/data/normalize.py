@@ -1,28 +1,67 @@
-from pandas import DataFrame
+from typing import Dict
+
+import pandas as pd
+from pandas import CategoricalDtype, DataFrame, Series
 
 from app.core.config import get_settings
 
+# Name columns hold a few dozen distinct values, so they are normalized once
+# per distinct value and stored as categoricals. share_name_categories gives
+# every table the same (sorted) dictionary, so merges and groupbys on names
+# stay categorical and sort alphabetically.
+NAME_COLUMNS = ("nama_kabupaten_kota", "nama_provinsi")
+
+
+def _normalize_unique(values: Series, collapse_spaces: bool) -> Series:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    names = pd.Series(uniques, dtype=object).astype(str).str.upper()
+    if collapse_spaces:
+        names = names.str.replace(r"\s+", " ", regex=True)
+    names = names.str.strip()
+    # Distinct raw spellings can normalize to the same name.
+    name_codes, categories = pd.factorize(names)
+    return pd.Series(
+        pd.Categorical.from_codes(name_codes[codes], categories=categories),
+        index=values.index,
+        name=values.name,
+    )
+
 
 def normalize_common(df: DataFrame) -> DataFrame:
     df = df.copy()
 
     if "nama_kabupaten_kota" in df.columns:
-        df["nama_kabupaten_kota"] = (
-            df["nama_kabupaten_kota"]
-            .astype(str)
-            .str.upper()
-            .str.replace(r"\s+", " ", regex=True)
-            .str.strip()
-        )
+        df["nama_kabupaten_kota"] = _normalize_unique(df["nama_kabupaten_kota"], collapse_spaces=True)
 
     if "nama_provinsi" in df.columns:
-        df["nama_provinsi"] = (
-            df["nama_provinsi"].astype(str).str.upper().str.strip()
-        )
+        df["nama_provinsi"] = _normalize_unique(df["nama_provinsi"], collapse_spaces=False)
 
     return df
 
 
+def share_name_categories(tables: Dict[str, DataFrame]) -> Dict[str, DataFrame]:
+    """Give each name column one sorted categorical dtype across all ``tables``."""
+    dtypes = {}
+    for column in NAME_COLUMNS:
+        values = set()
+        for df in tables.values():
+            if column in df.columns:
+                values.update(df[column].dropna().unique())
+        dtypes[column] = CategoricalDtype(sorted(values))
+
+    shared = {}
+    for key, df in tables.items():
+        columns = [column for column in dtypes if column in df.columns]
+        if columns:
+            # astype() to an unordered categorical with the same values in
+            # another order is a no-op, so recode explicitly.
+            df = df.assign(
+                **{column: pd.Categorical(df[column], dtype=dtypes[column]) for column in columns}
+            )
+        shared[key] = df
+    return shared
+
+
 def filter_jabar(df: DataFrame) -> DataFrame:
     settings = get_settings()
     if "kode_provinsi" in df.columns:
@@ -15,6 +15,12 @@ PROCESSED_FILES = {
     "fact_kemiskinan_kategori": "fact_kemiskinan_kategori.csv",
 }
 
+# Derived artifacts written next to the processed tables. They are not inputs
+# to the data version; each one records the version it was computed from.
+PROCESSED_ARTIFACTS = {
+    "fact_forecast": "fact_forecast.csv",
+}
+
 
 def resolve_source_path(base_dir: str, filename: str) -> Path:
     return Path(base_dir) / filename
@@ -0,0 +1,93 @@
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from pandas import CategoricalDtype, DataFrame, Series
+
+from app.data.normalize import share_name_categories
+
+# In-memory dtypes of the processed tables, applied when they are built and
+# when they are loaded (CSV keeps plain text). Years and region codes fit in
+# small ints (national kabupaten/kota codes stay below 10000); names and
+# kategori labels are categoricals. Measured values keep float64: they are
+# served as-is and float32 would change them (9.97 -> 9.970000267).
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "dim_kabupaten": {
+        "kode_kabupaten_kota": "int16",
+        "nama_kabupaten_kota": "category",
+        "kode_provinsi": "int8",
+        "nama_provinsi": "category",
+    },
+    "fact_pkh": {
+        "tahun": "int16",
+        "kode_kabupaten_kota": "int16",
+        "nama_kabupaten_kota": "category",
+        "jumlah_penerima_manfaat": "int32",
+    },
+    "fact_kemiskinan_persen": {
+        "tahun": "int16",
+        "kode_kabupaten_kota": "int16",
+        "nama_kabupaten_kota": "category",
+        "persentase_penduduk_miskin": "float64",
+    },
+    "fact_kemiskinan_abs": {
+        "tahun": "int16",
+        "kode_kabupaten_kota": "int16",
+        "nama_kabupaten_kota": "category",
+        "jumlah_penduduk_miskin": "float64",
+    },
+    "fact_kemiskinan_kategori": {
+        "tahun": "int16",
+        "periode_bulan": "category",
+        "kategori_daerah": "category",
+        "jumlah_penduduk": "float64",
+    },
+}
+
+
+def _fits_integer(series: Series, dtype: str) -> bool:
+    if not pd.api.types.is_numeric_dtype(series) or series.isna().any():
+        return False
+    if series.empty:
+        return True
+    info = np.iinfo(dtype)
+    values = series.to_numpy()
+    return bool(values.min() >= info.min and values.max() <= info.max and (values % 1 == 0).all())
+
+
+def _cast(series: Series, dtype: str) -> Series:
+    if dtype == "category":
+        return series if isinstance(series.dtype, CategoricalDtype) else series.astype("category")
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        # Missing or out-of-range values keep the column as parsed rather
+        # than failing the load.
+        return series.astype(dtype) if _fits_integer(series, dtype) else series
+    return series.astype(dtype)
+
+
+def enforce_schema(tables: Dict[str, DataFrame]) -> Dict[str, DataFrame]:
+    """Cast ``tables`` to TABLE_SCHEMAS, with one name dictionary across tables."""
+    typed = {}
+    for key, df in tables.items():
+        schema = TABLE_SCHEMAS.get(key, {})
+        columns = {column: _cast(df[column], dtype) for column, dtype in schema.items() if column in df.columns}
+        typed[key] = df.assign(**columns) if columns else df
+    return share_name_categories(typed)
+
+
+def memory_report(tables: Dict[str, DataFrame]) -> list[dict[str, Any]]:
+    """Rows, dtypes and deep memory usage (bytes) per table and column."""
+    report = []
+    for key, df in tables.items():
+        usage = df.memory_usage(index=True, deep=True)
+        report.append(
+            {
+                "table": key,
+                "rows": len(df),
+                "bytes": int(usage.sum()),
+                "columns": {
+                    column: {"dtype": str(df[column].dtype), "bytes": int(usage[column])} for column in df.columns
+                },
+            }
+        )
+    return report
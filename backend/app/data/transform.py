@@ -1,96 +1,137 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator
 
 import pandas as pd
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.data.forecasts import build_forecast_table
 from app.data.ingest import load_source_datasets
-from app.data.normalize import filter_jabar, normalize_common
+from app.data.normalize import share_name_categories
 from app.data.paths import PROCESSED_FILES, resolve_processed_path
-from app.data.validate import validate_all
+from app.data.schema import enforce_schema, memory_report
+from app.services.cache_warmer import schedule_cache_warmup
 
 logger = get_logger(__name__)
 
+# One table set written at a time per process; temp files are unique, so
+# builds in other processes never write or rename each other's files.
+_WRITE_LOCK = threading.Lock()
 
-def _coerce_numeric(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
-    df = df.copy()
-    for col in columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
 
+@contextmanager
+def _stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
 
-def build_fact_tables(
-    source_dir: str | None = None,
-    output_dir: str | None = None,
-) -> Dict[str, pd.DataFrame]:
-    settings = get_settings()
-    processed_dir = output_dir or settings.data_dir_processed
 
-    datasets = load_source_datasets(source_dir)
-    validate_all(datasets.items())
-
-    normalized: Dict[str, pd.DataFrame] = {}
-    for key, df in datasets.items():
-        df = normalize_common(df)
-        df = filter_jabar(df)
-        normalized[key] = df
-
-    persen = normalized["kemiskinan_persen"]
-    pkh = normalized["pkh"]
-    abs_miskin = normalized["kemiskinan_abs"]
-    kategori = normalized["kemiskinan_kategori"]
-
-    persen = _coerce_numeric(persen, ["kode_kabupaten_kota", "tahun", "persentase_penduduk_miskin"])
-    pkh = _coerce_numeric(pkh, ["kode_kabupaten_kota", "tahun", "jumlah_penerima_manfaat"])
-    abs_miskin = _coerce_numeric(abs_miskin, ["kode_kabupaten_kota", "tahun", "jumlah_penduduk_miskin"])
-    kategori = _coerce_numeric(kategori, ["tahun", "jumlah_penduduk"])
-
-    start_year = settings.default_start_year
-    end_year = settings.default_end_year
-
-    persen = persen[(persen["tahun"] >= start_year) & (persen["tahun"] <= end_year)]
-    pkh = pkh[(pkh["tahun"] >= start_year) & (pkh["tahun"] <= end_year)]
-    abs_miskin = abs_miskin[(abs_miskin["tahun"] >= start_year) & (abs_miskin["tahun"] <= end_year)]
-
-    dim_kabupaten = (
-        pd.concat(
-            [
-                persen[["kode_kabupaten_kota", "nama_kabupaten_kota", "kode_provinsi", "nama_provinsi"]],
-                pkh[["kode_kabupaten_kota", "nama_kabupaten_kota", "kode_provinsi", "nama_provinsi"]],
-            ],
-            ignore_index=True,
-        )
+def _build_dim_kabupaten(*facts: pd.DataFrame) -> pd.DataFrame:
+    """One row per kode_kabupaten_kota found in any kabupaten/kota fact table.
+
+    Analyses join facts on the code alone and take names from here, so every
+    fact code must be listed; the first table's spelling wins.
+    """
+    columns = ["kode_kabupaten_kota", "nama_kabupaten_kota", "kode_provinsi", "nama_provinsi"]
+    return (
+        pd.concat([df[columns] for df in facts], ignore_index=True)
         .dropna(subset=["kode_kabupaten_kota"])
         .drop_duplicates(subset=["kode_kabupaten_kota"])
         .sort_values("nama_kabupaten_kota")
         .reset_index(drop=True)
     )
 
-    fact_pkh = pkh[["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penerima_manfaat"]]
-    fact_persen = persen[["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "persentase_penduduk_miskin"]]
-    fact_abs = abs_miskin[["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penduduk_miskin"]]
-    fact_kategori = kategori[["tahun", "periode_bulan", "kategori_daerah", "jumlah_penduduk"]]
 
-    output_path = Path(processed_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+def _temp_path(path: Path) -> Path:
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as handle:
+        return Path(handle.name)
+
+
+def _write_tables(tables: Dict[str, pd.DataFrame], processed_dir: str) -> None:
+    """Write every table to a temp file in parallel, then rename them into place.
+
+    The renames run back to back once all files are written, so readers see
+    either the old set of tables or the new one for all but a moment.
+    """
+    Path(processed_dir).mkdir(parents=True, exist_ok=True)
+    paths = {key: resolve_processed_path(processed_dir, PROCESSED_FILES[key]) for key in tables}
 
-    dim_kabupaten.to_csv(resolve_processed_path(processed_dir, PROCESSED_FILES["dim_kabupaten"]), index=False)
-    fact_pkh.to_csv(resolve_processed_path(processed_dir, PROCESSED_FILES["fact_pkh"]), index=False)
-    fact_persen.to_csv(resolve_processed_path(processed_dir, PROCESSED_FILES["fact_kemiskinan_persen"]), index=False)
-    fact_abs.to_csv(resolve_processed_path(processed_dir, PROCESSED_FILES["fact_kemiskinan_abs"]), index=False)
-    fact_kategori.to_csv(resolve_processed_path(processed_dir, PROCESSED_FILES["fact_kemiskinan_kategori"]), index=False)
+    with _WRITE_LOCK:
+        tmp_paths = {key: _temp_path(path) for key, path in paths.items()}
+        try:
+            with ThreadPoolExecutor(max_workers=len(tables), thread_name_prefix="write-tables") as pool:
+                futures = [pool.submit(table.to_csv, tmp_paths[key], index=False) for key, table in tables.items()]
+                for future in futures:
+                    future.result()
+            for key, path in paths.items():
+                os.replace(tmp_paths[key], path)
+        except BaseException:
+            for tmp_path in tmp_paths.values():
+                tmp_path.unlink(missing_ok=True)
+            raise
 
-    logger.info("Processed datasets saved to %s", processed_dir)
 
-    return {
+def build_fact_tables(
+    source_dir: str | None = None,
+    output_dir: str | None = None,
+    with_forecasts: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    settings = get_settings()
+    processed_dir = output_dir or settings.data_dir_processed
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    # Rows come back normalized, restricted to Jawa Barat and (for the
+    # kabupaten/kota datasets) to the configured year range.
+    with _stage(timings, "load"):
+        datasets = share_name_categories(load_source_datasets(source_dir))
+    persen = datasets["kemiskinan_persen"]
+    pkh = datasets["pkh"]
+    abs_miskin = datasets["kemiskinan_abs"]
+    kategori = datasets["kemiskinan_kategori"]
+
+    with _stage(timings, "dim_kabupaten"):
+        dim_kabupaten = _build_dim_kabupaten(persen, pkh, abs_miskin)
+
+    tables = {
         "dim_kabupaten": dim_kabupaten,
-        "fact_pkh": fact_pkh,
-        "fact_kemiskinan_persen": fact_persen,
-        "fact_kemiskinan_abs": fact_abs,
-        "fact_kemiskinan_kategori": fact_kategori,
+        "fact_pkh": pkh[["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penerima_manfaat"]],
+        "fact_kemiskinan_persen": persen[
+            ["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "persentase_penduduk_miskin"]
+        ],
+        "fact_kemiskinan_abs": abs_miskin[
+            ["tahun", "kode_kabupaten_kota", "nama_kabupaten_kota", "jumlah_penduduk_miskin"]
+        ],
+        "fact_kemiskinan_kategori": kategori[["tahun", "periode_bulan", "kategori_daerah", "jumlah_penduduk"]],
     }
+    tables = enforce_schema(tables)
+
+    with _stage(timings, "write"):
+        _write_tables(tables, processed_dir)
+    logger.info("Processed datasets saved to %s", processed_dir, extra={"memory": memory_report(tables)})
+
+    if with_forecasts:
+        with _stage(timings, "forecasts"):
+            build_forecast_table(tables, processed_dir)
+
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "build_fact_tables finished in %.1f ms (%s)",
+        timings["total"],
+        ", ".join(f"{stage} {ms:.1f} ms" for stage, ms in timings.items() if stage != "total"),
+        extra={"stage_ms": timings},
+    )
+
+    schedule_cache_warmup()
+    return tables
 
 
 def load_processed_tables(processed_dir: str | None = None) -> Dict[str, pd.DataFrame]:
@@ -105,7 +146,7 @@ def load_processed_tables(processed_dir: str | None = None) -> Dict[str, pd.Data
         path = resolve_processed_path(base_dir, filename)
         tables[key] = pd.read_csv(path)
 
-    return tables
+    return enforce_schema(tables)
 
 
 def ensure_processed_tables(
@@ -1,6 +1,11 @@
-from typing import Iterable
+from pathlib import Path
+from typing import Any, Iterable
 
-from pandas import DataFrame
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+from app.core.config import get_settings
 
 REQUIRED_COLUMNS = {
     "kemiskinan_persen": {
@@ -38,6 +43,28 @@ REQUIRED_COLUMNS = {
 }
 
 
+TEXT_COLUMNS = {"nama_provinsi", "nama_kabupaten_kota", "kategori_daerah", "periode_bulan"}
+
+# Row-level checks run on uploads before any rebuild. Rows outside Jawa Barat
+# are dropped by the pipeline, so only type checks apply to them; ranges, key
+# uniqueness and codes are checked on the Jabar rows. Errors reject the
+# upload, warnings are reported only.
+KEY_COLUMNS = {
+    "kemiskinan_persen": ("tahun", "kode_kabupaten_kota"),
+    "pkh": ("tahun", "kode_kabupaten_kota"),
+    "kemiskinan_abs": ("tahun", "kode_kabupaten_kota"),
+    "kemiskinan_kategori": ("tahun", "periode_bulan", "kategori_daerah"),
+}
+INTEGER_COLUMNS = {"tahun", "kode_provinsi", "kode_kabupaten_kota"}
+VALUE_RANGES = {
+    "persentase_penduduk_miskin": (0.0, 100.0),
+    "jumlah_penerima_manfaat": (0.0, None),
+    "jumlah_penduduk_miskin": (0.0, None),
+    "jumlah_penduduk": (0.0, None),
+}
+ISSUE_SAMPLE_SIZE = 5
+
+
 def validate_dataset(df: DataFrame, dataset_key: str) -> None:
     required = REQUIRED_COLUMNS.get(dataset_key)
     if not required:
@@ -51,3 +78,164 @@ def validate_dataset(df: DataFrame, dataset_key: str) -> None:
 def validate_all(datasets: Iterable[tuple[str, DataFrame]]) -> None:
     for key, df in datasets:
         validate_dataset(df, key)
+
+
+class _IssueLog:
+    """Counts and row samples per (severity, check, column)."""
+
+    def __init__(self) -> None:
+        self.issues: dict[tuple[str, str, str | None], dict[str, Any]] = {}
+
+    def add(
+        self,
+        severity: str,
+        check: str,
+        column: str | None,
+        frame: DataFrame,
+        mask: Any,
+        rows: np.ndarray,
+    ) -> None:
+        """Record the rows of ``frame`` selected by ``mask``; ``rows`` are their 0-based file rows."""
+        mask = np.asarray(mask, dtype=bool)
+        count = int(mask.sum())
+        if not count:
+            return
+        issue = self.issues.setdefault(
+            (severity, check, column), {"check": check, "column": column, "count": 0, "samples": []}
+        )
+        issue["count"] += count
+        room = ISSUE_SAMPLE_SIZE - len(issue["samples"])
+        if room > 0:
+            positions = np.flatnonzero(mask)[:room]
+            sample = frame.iloc[positions].astype(object)
+            records = sample.where(sample.notna(), None).to_dict(orient="records")
+            issue["samples"].extend(
+                {"row": int(rows[position]) + 1, "values": values} for position, values in zip(positions, records)
+            )
+
+    def by_severity(self, severity: str) -> list[dict[str, Any]]:
+        return [issue for (level, _, _), issue in self.issues.items() if level == severity]
+
+
+def _check_chunk(
+    chunk: DataFrame,
+    rows: np.ndarray,
+    dataset_key: str,
+    dim_codes: np.ndarray | None,
+    log: _IssueLog,
+) -> DataFrame:
+    """Type and range checks on one chunk read as text; returns the key columns of its Jabar rows."""
+    numeric: dict[str, Series] = {}
+    blanks: dict[str, np.ndarray] = {}
+    for column in sorted(REQUIRED_COLUMNS[dataset_key] - TEXT_COLUMNS):
+        raw = chunk[column]
+        blank = (raw.isna() | (raw.str.strip() == "")).to_numpy()
+        values = pd.to_numeric(raw, errors="coerce")
+        log.add("error", "non_numeric", column, chunk, ~blank & values.isna().to_numpy(), rows)
+        if column in INTEGER_COLUMNS:
+            log.add("error", "not_integer", column, chunk, (values % 1 != 0) & values.notna(), rows)
+        numeric[column] = values
+        blanks[column] = blank
+
+    jabar = (numeric["kode_provinsi"] == get_settings().prov_code_jabar).to_numpy()
+    # A blank key column is an error on Jabar rows only; elsewhere it is reported.
+    for column, blank in blanks.items():
+        if column in INTEGER_COLUMNS:
+            log.add("error", "missing_value", column, chunk, jabar & blank, rows)
+            log.add("warning", "missing_value", column, chunk, ~jabar & blank, rows)
+        else:
+            log.add("warning", "missing_value", column, chunk, blank, rows)
+    for column, (low, high) in VALUE_RANGES.items():
+        if column not in numeric:
+            continue
+        values = numeric[column].to_numpy()
+        out = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            out |= values < low
+        if high is not None:
+            out |= values > high
+        log.add("error", "out_of_range", column, chunk, jabar & out, rows)
+
+    if "kode_kabupaten_kota" in numeric:
+        kode = numeric["kode_kabupaten_kota"]
+        known = jabar & kode.notna().to_numpy()
+        mismatch = ((kode // 100) != numeric["kode_provinsi"]).to_numpy()
+        log.add("error", "code_province_mismatch", "kode_kabupaten_kota", chunk, known & mismatch, rows)
+        if dim_codes is not None:
+            unknown = ~kode.isin(dim_codes).to_numpy()
+            log.add("error", "unknown_code", "kode_kabupaten_kota", chunk, known & unknown, rows)
+
+    keys = DataFrame(
+        {
+            column: numeric[column] if column in numeric else chunk[column].str.upper().str.strip()
+            for column in KEY_COLUMNS[dataset_key]
+        }
+    )
+    keys["row"] = rows
+    return keys[jabar]
+
+
+def infer_dataset_key(columns: Iterable[str]) -> str | None:
+    """The dataset whose required columns are all in ``columns`` (None if none or several)."""
+    columns = set(columns)
+    matches = [key for key, required in REQUIRED_COLUMNS.items() if required <= columns]
+    return matches[0] if len(matches) == 1 else None
+
+
+def validate_rows(
+    path: Path,
+    dataset_key: str,
+    dim_kabupaten: DataFrame | None = None,
+    chunksize: int | None = None,
+) -> dict[str, Any]:
+    """Check types, ranges, key uniqueness and codes of a source CSV in one chunked pass.
+
+    Codes are checked against ``dim_kabupaten`` when it is given. The report
+    lists errors and warnings with counts and up to ISSUE_SAMPLE_SIZE sample
+    rows (1-based data rows, header excluded).
+    """
+    log = _IssueLog()
+    report: dict[str, Any] = {"dataset": dataset_key, "rows": 0, "jabar_rows": 0}
+
+    header = pd.read_csv(path, nrows=0).columns
+    missing = sorted(REQUIRED_COLUMNS[dataset_key] - set(header))
+    if missing:
+        issue = {"check": "missing_columns", "column": None, "count": len(missing), "samples": missing}
+        return {**report, "valid": False, "errors": [issue], "warnings": []}
+
+    dim_codes = None
+    if dim_kabupaten is not None:
+        dim_codes = dim_kabupaten["kode_kabupaten_kota"].dropna().to_numpy()
+
+    key_parts = []
+    offset = 0
+    chunksize = chunksize or get_settings().ingest_chunk_rows
+    usecols = sorted(REQUIRED_COLUMNS[dataset_key])
+    with pd.read_csv(path, usecols=usecols, dtype=str, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk.reset_index(drop=True)
+            rows = np.arange(offset, offset + len(chunk))
+            key_parts.append(_check_chunk(chunk, rows, dataset_key, dim_codes, log))
+            offset += len(chunk)
+    report["rows"] = offset
+
+    if key_parts:
+        keys = pd.concat(key_parts, ignore_index=True)
+        report["jabar_rows"] = len(keys)
+        key_columns = list(KEY_COLUMNS[dataset_key])
+        complete = keys[key_columns].notna().all(axis=1)
+        duplicates = keys[complete & keys.duplicated(subset=key_columns, keep=False)]
+        shown = duplicates[key_columns].astype(object)
+        for column in INTEGER_COLUMNS.intersection(key_columns):
+            shown[column] = [int(value) if float(value).is_integer() else value for value in shown[column]]
+        log.add(
+            "error",
+            "duplicate_key",
+            ",".join(key_columns),
+            shown,
+            np.ones(len(shown), dtype=bool),
+            duplicates["row"].to_numpy(),
+        )
+
+    errors = log.by_severity("error")
+    return {**report, "valid": not errors, "errors": errors, "warnings": log.by_severity("warning")}
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.core.config import get_settings
+from app.data.paths import PROCESSED_FILES, resolve_processed_path
+
+# Content hashes are memoized per (path, size, mtime) so the version check on
+# each request only stats the files; they are re-read only after a rebuild.
+_HASH_CACHE: dict[tuple[str, int, int], str] = {}
+_HASH_LOCK = threading.Lock()
+
+
+def _file_hash(path: Path, size: int, mtime_ns: int) -> str:
+    key = (str(path), size, mtime_ns)
+    with _HASH_LOCK:
+        cached = _HASH_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha1()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _HASH_LOCK:
+        _HASH_CACHE[key] = value
+    return value
+
+
+def _manifest(paths: dict[str, Path]) -> dict[str, Any]:
+    files: dict[str, dict[str, Any]] = {}
+    last_modified = 0.0
+    for key, path in paths.items():
+        if not path.exists():
+            continue
+        stat = path.stat()
+        files[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha1": _file_hash(path, stat.st_size, stat.st_mtime_ns),
+        }
+        last_modified = max(last_modified, stat.st_mtime)
+    return {"files": files, "last_modified": last_modified}
+
+
+def get_data_manifest(processed_dir: str | None = None) -> dict[str, Any]:
+    settings = get_settings()
+    base_dir = processed_dir or settings.data_dir_processed
+
+    paths = {key: resolve_processed_path(base_dir, filename) for key, filename in PROCESSED_FILES.items()}
+    return {"dir": str(Path(base_dir)), **_manifest(paths)}
+
+
+def get_input_manifest() -> dict[str, Any]:
+    """Like get_data_manifest, for the non-processed files responses read (map and boundary geometry)."""
+    settings = get_settings()
+    return _manifest(
+        {
+            "jabar_geojson": Path(settings.project_root) / settings.jabar_geojson_path,
+            "kabkota_boundaries": Path(settings.kabkota_boundaries_path),
+        }
+    )
+
+
+def version_from_manifest(manifest: dict[str, Any]) -> str:
+    digest = hashlib.sha1()
+    for key in sorted(manifest["files"]):
+        digest.update(f"{key}:{manifest['files'][key]['sha1']};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def get_data_version(processed_dir: str | None = None) -> str:
+    return version_from_manifest(get_data_manifest(processed_dir))
+
+
+def get_file_version(path: Path) -> str:
+    """Content hash of a single file (e.g. the boundary geometry)."""
+    stat = path.stat()
+    return _file_hash(path, stat.st_size, stat.st_mtime_ns)[:16]
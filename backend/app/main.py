@@ -1,17 +1,48 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.compression import CompressionMiddleware
+from app.api.http_cache import ConditionalGetMiddleware
+from app.api.profiling import ProfilingMiddleware
+from app.api.request_logging import RequestLogMiddleware
 from app.api.routes import api_router
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.data.analysis.predictive import shutdown_forecast_executor
+from app.data.version import get_data_version
+from app.services.cache_warmer import get_warmup_progress, register_app, schedule_cache_warmup
+from app.services.warmup import start_import_warmup
 
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.warmup_imports:
+        start_import_warmup()
+    register_app(app)
+    schedule_cache_warmup()
+    yield
+    shutdown_forecast_executor()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
 
-    app = FastAPI(title=settings.app_name, version=settings.app_version)
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        lifespan=lifespan,
+    )
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+    if settings.http_cache_enabled:
+        app.add_middleware(ConditionalGetMiddleware)
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_allow_origins,
@@ -19,6 +50,7 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(RequestLogMiddleware)
 
     app.include_router(api_router, prefix="/api")
 
@@ -26,6 +58,12 @@ def create_app() -> FastAPI:
     def health() -> dict:
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["health"])
+    def ready() -> dict:
+        warmup = get_warmup_progress()
+        status = "warming" if warmup["state"] in ("scheduled", "running") else "ok"
+        return {"status": status, "data_version": get_data_version(), "warmup": warmup}
+
     logger.info("API ready")
     return app
 
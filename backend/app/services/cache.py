@@ -1,13 +1,305 @@
-# Simple in-memory cache for analysis results.
+# Result cache: a per-process LRU (L1) in front of a SQLite file in
+# data_dir_cache (L2) that every worker process shares. Keys carry the data
+# version, so entries from older data are never read again. L1 holds at most
+# cache_l1_max_entries entries and one version per (namespace, params): storing
+# a newer version drops the older one. Old versions age out of L2 through its
+# size-bounded LRU eviction.
+#
+# get_or_compute adds single-flight coalescing (concurrent callers for the same
+# key share one computation) and, optionally, stale-while-revalidate: after the
+# data version changes, the last result for the same params is returned at
+# once while the new one is computed in the background.
 
-from typing import Any
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable
 
-_CACHE: dict[str, Any] = {}
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.data.version import get_data_version
+
+logger = get_logger(__name__)
+
+L2_FILENAME = "results.sqlite3"
+# Fraction of the size limit kept after an eviction, so evictions are rare.
+L2_EVICT_TARGET = 0.8
+# Bytes a process writes (as a fraction of the size limit) between checks of
+# the total size; with the headroom left by eviction this bounds the overshoot.
+L2_CHECK_FRACTION = 0.05
+# Hits refresh an entry's access time at most this often (seconds), so reads
+# rarely need SQLite's write lock; LRU order is kept to this granularity.
+L2_TOUCH_INTERVAL = 60.0
+
+_CACHE: OrderedDict[str, Any] = OrderedDict()
+# (namespace, params) -> key of the version held in _CACHE for them.
+_CACHE_SLOTS: dict[str, str] = {}
+_CACHE_LOCK = threading.Lock()
+_LOCAL = threading.local()
+# Bytes written to L2 by this process since the size was last checked.
+_L2_UNCHECKED = 0
+_L2_UNCHECKED_LOCK = threading.Lock()
+
+_INFLIGHT: dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+# Set for profiled requests: reads miss and get_or_compute recomputes, so the
+# profile measures the work itself. It follows the request into worker threads.
+_BYPASS: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+# (namespace, params) -> key of the most recent version stored for them,
+# least recently used first and bounded like _CACHE.
+_LATEST: OrderedDict[str, str] = OrderedDict()
+_LATEST_LOCK = threading.Lock()
+
+
+def make_cache_key(namespace: str, data_version: str, params: dict[str, Any] | None = None) -> str:
+    encoded = json.dumps(params or {}, sort_keys=True, default=str)
+    return f"{namespace}:{data_version}:{encoded}"
+
+
+def _slot(key: str) -> str:
+    namespace, _, encoded = key.split(":", 2)
+    return f"{namespace}:*:{encoded}"
+
+
+def _l1_get(key: str) -> Any | None:
+    with _CACHE_LOCK:
+        value = _CACHE.get(key)
+        if value is not None:
+            _CACHE.move_to_end(key)
+        return value
+
+
+def _l1_set(key: str, value: Any) -> None:
+    max_entries = max(get_settings().cache_l1_max_entries, 1)
+    slot = _slot(key)
+    with _CACHE_LOCK:
+        previous = _CACHE_SLOTS.get(slot)
+        if previous is not None and previous != key:
+            _CACHE.pop(previous, None)
+        _CACHE_SLOTS[slot] = key
+        _CACHE[key] = value
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > max_entries:
+            evicted, _ = _CACHE.popitem(last=False)
+            evicted_slot = _slot(evicted)
+            if _CACHE_SLOTS.get(evicted_slot) == evicted:
+                del _CACHE_SLOTS[evicted_slot]
+
+
+def _l2_connection() -> sqlite3.Connection | None:
+    settings = get_settings()
+    if not settings.cache_l2_enabled:
+        return None
+
+    path = Path(settings.data_dir_cache) / L2_FILENAME
+    conn = getattr(_LOCAL, "conn", None)
+    # Connections are per thread and must not cross a fork.
+    if conn is not None and _LOCAL.pid == os.getpid() and _LOCAL.path == path:
+        return conn
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+    _LOCAL.conn, _LOCAL.pid, _LOCAL.path = conn, os.getpid(), path
+    return conn
+
+
+def _l2_get(key: str) -> Any | None:
+    try:
+        conn = _l2_connection()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, accessed = row
+        now = time.time()
+        if now - accessed > L2_TOUCH_INTERVAL:
+            _l2_touch(conn, key, now)
+        return pickle.loads(value)
+    except (sqlite3.Error, pickle.UnpicklingError, OSError):
+        logger.warning("L2 cache read failed for %s", key, exc_info=True)
+        return None
+
+
+def _l2_touch(conn: sqlite3.Connection, key: str, now: float) -> None:
+    # Best effort: a busy database must not turn a hit into a miss.
+    try:
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+    except sqlite3.OperationalError:
+        logger.debug("L2 access time not updated for %s", key, exc_info=True)
+
+
+def _l2_set(key: str, value: Any) -> None:
+    try:
+        conn = _l2_connection()
+        if conn is None:
+            return
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+            (key, blob, len(blob), time.time()),
+        )
+        if _l2_size_check_due(len(blob)):
+            _l2_evict(conn)
+    except (sqlite3.Error, pickle.PicklingError, OSError):
+        logger.warning("L2 cache write failed for %s", key, exc_info=True)
+
+
+def _l2_size_check_due(written: int) -> bool:
+    global _L2_UNCHECKED
+    max_bytes = get_settings().cache_l2_max_mb * 1024 * 1024
+    with _L2_UNCHECKED_LOCK:
+        _L2_UNCHECKED += written
+        if _L2_UNCHECKED < max_bytes * L2_CHECK_FRACTION:
+            return False
+        _L2_UNCHECKED = 0
+        return True
+
+
+def _l2_evict(conn: sqlite3.Connection) -> None:
+    max_bytes = get_settings().cache_l2_max_mb * 1024 * 1024
+    (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+    if total <= max_bytes:
+        return
+
+    # Another worker may be evicting too; re-read the total under the write lock.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        excess = total - int(max_bytes * L2_EVICT_TARGET)
+        if excess > 0:
+            # Least recently used first, until the freed bytes cover the excess.
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, size, SUM(size) OVER (ORDER BY accessed, key) AS freed FROM entries"
+                " ) WHERE freed - size < ?"
+                ")",
+                (excess,),
+            )
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def bypass_cache() -> None:
+    """Make cache reads miss for the rest of the current context."""
+    _BYPASS.set(True)
 
 
 def get_cached(key: str) -> Any | None:
-    return _CACHE.get(key)
+    if _BYPASS.get():
+        return None
+    value = _l1_get(key)
+    if value is not None:
+        return value
+    value = _l2_get(key)
+    if value is not None:
+        _l1_set(key, value)
+    return value
 
 
 def set_cached(key: str, value: Any) -> None:
-    _CACHE[key] = value
+    _l1_set(key, value)
+    _l2_set(key, value)
+
+
+def _compute_once(key: str, compute: Callable[[], Any]) -> Any:
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _INFLIGHT[key] = future
+    if not leader:
+        return future.result()
+
+    try:
+        value = compute()
+        set_cached(key, value)
+        future.set_result(value)
+        return value
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+def _revalidate(key: str, compute: Callable[[], Any]) -> None:
+    with _INFLIGHT_LOCK:
+        if key in _INFLIGHT:
+            return
+
+    def _run() -> None:
+        try:
+            _compute_once(key, compute)
+        except Exception:
+            logger.exception("Background revalidation failed for %s", key)
+
+    threading.Thread(target=_run, name="cache-revalidate", daemon=True).start()
+
+
+def _latest_get(slot: str) -> str | None:
+    with _LATEST_LOCK:
+        return _LATEST.get(slot)
+
+
+def _latest_set(slot: str, key: str) -> None:
+    max_entries = max(get_settings().cache_l1_max_entries, 1)
+    with _LATEST_LOCK:
+        _LATEST[slot] = key
+        _LATEST.move_to_end(slot)
+        while len(_LATEST) > max_entries:
+            _LATEST.popitem(last=False)
+
+
+def get_or_compute(
+    namespace: str,
+    params: dict[str, Any],
+    compute: Callable[[], Any],
+    stale_while_revalidate: bool = False,
+    version: str | None = None,
+) -> tuple[Any, bool]:
+    """Cached value for the current data version, computing it at most once.
+
+    ``version`` replaces the data version for results that do not depend on
+    the processed data (e.g. built from the geometry files only).
+
+    Returns ``(value, stale)``; ``stale`` is True when an older version's
+    result was served while the current one is computed in the background.
+    """
+    if _BYPASS.get():
+        return compute(), False
+
+    key = make_cache_key(namespace, version or get_data_version(), params)
+    slot = make_cache_key(namespace, "*", params)
+
+    value = get_cached(key)
+    if value is None and stale_while_revalidate and get_settings().cache_stale_while_revalidate:
+        latest = _latest_get(slot)
+        stale = get_cached(latest) if latest is not None and latest != key else None
+        if stale is not None:
+            _revalidate(key, compute)
+            return stale, True
+
+    if value is None:
+        value = _compute_once(key, compute)
+    _latest_set(slot, key)
+    return value, False
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+from starlette.types import ASGIApp, Message
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.data.version import get_data_version
+
+logger = get_logger(__name__)
+
+# Replays the dashboard's predictable queries through the app itself, so the
+# response cache (and anything the routes cache on the way) is filled before
+# the first user asks. Requests run one at a time with a pause in between so
+# live traffic keeps priority; a new schedule restarts the pass for the new
+# data version.
+
+TIPES = ("all", "kota", "kabupaten")
+METRICS = ("kemiskinan", "pkh", "kemiskinan_abs")
+TREND_METRICS = ("kemiskinan", "pkh")
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+_APP: ASGIApp | None = None
+_THREAD: threading.Thread | None = None
+_REQUESTED = threading.Event()
+_LOCK = threading.Lock()
+_PROGRESS: dict[str, Any] = {"state": "idle"}
+
+
+def build_warmup_requests() -> list[tuple[str, str]]:
+    """(path, query) pairs, the dashboard's default view first."""
+    settings = get_settings()
+    start, end = settings.default_start_year, settings.default_end_year
+    years = list(range(end, start - 1, -1))
+    year_range = {"start": start, "end": end}
+
+    per_filter: list[tuple[str, list[dict[str, Any]]]] = [
+        ("/api/summary", [{"year": year} for year in years]),
+        ("/api/trend", [{"metric": metric} for metric in TREND_METRICS]),
+        ("/api/trend/matrix", [year_range]),
+        ("/api/kabkota", [{"year": year, "metric": metric} for year in years for metric in METRICS]),
+        ("/api/map", [{"year": year, "metric": metric} for year in years for metric in METRICS]),
+        ("/api/scatter", [{"year": year} for year in years]),
+        ("/api/insights", [year_range]),
+        ("/api/insights/rank-movers", [{"metric": metric, **year_range} for metric in METRICS]),
+        (
+            "/api/insights/top-delta",
+            [{"metric": metric, "year_a": start, "year_b": end} for metric in METRICS],
+        ),
+        ("/api/compare-years", [{"year_a": start, "year_b": end, "metric": metric} for metric in METRICS]),
+        ("/api/correlation", [{"year": year} for year in years]),
+        ("/api/correlation/matrix", [year_range]),
+        ("/api/regression", [year_range]),
+        ("/api/regression/grid", [year_range]),
+        ("/api/compare", [{"year": year} for year in years]),
+        ("/api/effectiveness", [year_range]),
+        ("/api/effectiveness/kabkota", [year_range]),
+        ("/api/spatial/lisa", [{"year": end, "metric": metric} for metric in METRICS]),
+        ("/api/predict", [{"metric": metric, "horizon": 5, "method": "auto"} for metric in ("all",) + METRICS]),
+        (
+            "/api/predict/compare",
+            [{"metric": metric, "test_years": 2, "details": "false"} for metric in METRICS],
+        ),
+    ]
+
+    jobs: list[tuple[int, int, str, str]] = [
+        (0, 0, "/api/map/geojson", ""),
+        (0, 0, "/api/report/summary", ""),
+    ]
+    jobs.extend((0, 0, "/api/spatial/moran", urlencode({"year": end, "metric": metric})) for metric in METRICS)
+    for tipe in TIPES:
+        for path, param_list in per_filter:
+            for params in param_list:
+                query = dict(params)
+                if tipe != "all":
+                    query["tipe"] = tipe
+                is_default_view = tipe == "all" and params.get("year", end) == end
+                jobs.append((int(tipe != "all"), int(not is_default_view), path, urlencode(query)))
+
+    # Stable sort: default view, then the year selector, then the other tipes.
+    jobs.sort(key=lambda job: (job[0], job[1]))
+    return [(path, query) for _, _, path, query in jobs]
+
+
+async def _dispatch(app: ASGIApp, path: str, query: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": query.encode("latin-1"),
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", ACCEPT_ENCODING.encode("latin-1"))],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    status = 0
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect; only "disconnect" once done.
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+def _update(**values: Any) -> None:
+    with _LOCK:
+        _PROGRESS.update(values)
+
+
+async def _warm(app: ASGIApp) -> bool:
+    """One pass over the warm-up requests; False if a newer pass was requested."""
+    requests = build_warmup_requests()
+    pause = get_settings().cache_warmup_pause_ms / 1000
+    started = time.time()
+    with _LOCK:
+        _PROGRESS.clear()
+        _PROGRESS.update(
+            state="running",
+            data_version=get_data_version(),
+            total=len(requests),
+            completed=0,
+            failed=0,
+            started_at=started,
+            finished_at=None,
+        )
+
+    for path, query in requests:
+        if _REQUESTED.is_set():
+            return False
+        try:
+            status = await _dispatch(app, path, query)
+        except Exception:
+            logger.exception("Cache warm-up request failed: %s?%s", path, query)
+            status = 500
+        with _LOCK:
+            _PROGRESS["completed"] += 1
+            if status >= 400:
+                _PROGRESS["failed"] += 1
+        await asyncio.sleep(pause)
+
+    finished = time.time()
+    _update(state="done", finished_at=finished)
+    with _LOCK:
+        failed = _PROGRESS["failed"]
+    logger.info("Cache warm-up: %s requests (%s failed) in %.1fs", len(requests), failed, finished - started)
+    return True
+
+
+def _run() -> None:
+    while True:
+        _REQUESTED.wait()
+        _REQUESTED.clear()
+        app = _APP
+        if app is None:
+            continue
+        try:
+            asyncio.run(_warm(app))
+        except Exception:
+            logger.exception("Cache warm-up failed")
+            _update(state="failed", finished_at=time.time())
+
+
+def register_app(app: ASGIApp) -> None:
+    """Remember the app warm-ups are replayed against (set once at startup)."""
+    global _APP
+    _APP = app
+
+
+def schedule_cache_warmup() -> None:
+    """Start (or restart) a background warm-up pass; no-op without a registered app."""
+    global _THREAD
+    if _APP is None or not get_settings().cache_warmup_enabled:
+        return
+    with _LOCK:
+        _PROGRESS.update(state="scheduled")
+        _REQUESTED.set()
+        if _THREAD is None or not _THREAD.is_alive():
+            _THREAD = threading.Thread(target=_run, name="cache-warmup", daemon=True)
+            _THREAD.start()
+
+
+def get_warmup_progress() -> dict[str, Any]:
+    with _LOCK:
+        return dict(_PROGRESS)
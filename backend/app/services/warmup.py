@@ -0,0 +1,45 @@
+import importlib
+import threading
+import time
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Modules that are imported lazily by the analysis code. Importing them in the
+# background after startup keeps worker boot fast without making the first
+# prediction request pay for the import.
+HEAVY_MODULES = (
+    "statsmodels.tsa.holtwinters",
+    "statsmodels.tsa.arima.model",
+    "scipy.special",
+    "scipy.sparse",
+)
+
+_WARMUP_THREAD: threading.Thread | None = None
+
+
+def _import_modules(modules: tuple[str, ...]) -> None:
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            logger.exception("Warm-up import failed: %s", name)
+            continue
+        logger.info("Warm-up imported %s in %.2fs", name, time.perf_counter() - started)
+
+
+def start_import_warmup(modules: tuple[str, ...] = HEAVY_MODULES) -> threading.Thread:
+    global _WARMUP_THREAD
+    if _WARMUP_THREAD is not None and _WARMUP_THREAD.is_alive():
+        return _WARMUP_THREAD
+
+    _WARMUP_THREAD = threading.Thread(
+        target=_import_modules,
+        args=(modules,),
+        name="import-warmup",
+        daemon=True,
+    )
+    _WARMUP_THREAD.start()
+    return _WARMUP_THREAD
@@ -0,0 +1,78 @@
+"""Import-time report for the API.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+summarizes the slowest imports by cumulative time.
+
+Usage (from the backend directory):
+    python scripts/import_time.py
+    python scripts/import_time.py --module app.main --top 25 --json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def measure_imports(module: str) -> list[dict]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return rows
+
+
+def build_report(module: str, top: int) -> dict:
+    rows = measure_imports(module)
+    target = next((row for row in rows if row["module"] == module), None)
+    slowest = sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": target["cumulative_ms"] if target else None,
+        "module_count": len(rows),
+        "statsmodels_loaded": any(row["module"].startswith("statsmodels") for row in rows),
+        "slowest": slowest,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = build_report(args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['module']}: {report['total_ms']:.1f} ms ({report['module_count']} modules)")
+    print(f"statsmodels loaded at import: {report['statsmodels_loaded']}")
+    for row in report["slowest"]:
+        print(f"{row['cumulative_ms']:10.1f} ms  {'  ' * row['depth']}{row['module']}")
+
+
+if __name__ == "__main__":
+    main()
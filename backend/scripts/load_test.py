@@ -0,0 +1,277 @@
+"""Load test that replays the dashboard's request pattern against a local API.
+
+Each simulated user mounts the dashboard (kabkota list), then repeatedly
+changes one filter (year, metric, tipe or kabkota) and fires the same 12-call
+burst as ``frontend/src/lib/useDashboardData.ts``, sometimes followed by a
+``/api/predict`` call from the prediction page, with a random think time in
+between. Unless ``--url`` is given, uvicorn is started locally for the run.
+
+The report (JSON) has per-route p50/p95/p99 latency, throughput and error
+rates, plus the latency of whole bursts (the time until a filter change has
+fully rendered).
+
+Usage (from the backend directory):
+    python scripts/load_test.py --users 20 --duration 60 --think-time 2
+    python scripts/load_test.py --url http://127.0.0.1:8000 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+YEARS = list(range(2017, 2025))
+METRICS = ["kemiskinan", "pkh", "kemiskinan_abs"]
+TIPES = ["all", "kota", "kabupaten"]
+PREDICT_METHODS = ["auto", "holt", "holt_fast", "linear"]
+# Browsers open at most six connections per host.
+CONNECTIONS_PER_USER = 6
+
+
+def dashboard_burst(state: dict) -> list[str]:
+    """The 12 requests useDashboardData issues after a filter change."""
+    params = []
+    if state["tipe"] != "all":
+        params.append(f"tipe={state['tipe']}")
+    if state["kabkota"]:
+        params.append(f"kabkota={state['kabkota']}")
+    filters = f"&{'&'.join(params)}" if params else ""
+    year, metric = state["year"], state["metric"]
+    return [
+        f"/api/summary?year={year}{filters}",
+        f"/api/trend?metric=kemiskinan{filters}",
+        f"/api/kabkota?year={year}&metric={metric}{filters}",
+        f"/api/map?year={year}&metric={metric}{filters}",
+        "/api/map/geojson",
+        f"/api/scatter?year={year}{filters}",
+        f"/api/insights?start=2017&end=2024{filters}",
+        f"/api/compare-years?year_a=2017&year_b=2024&metric={metric}{filters}",
+        f"/api/correlation?year={year}{filters}",
+        f"/api/regression?start=2017&end=2024{filters}",
+        f"/api/compare?year={year}{filters}",
+        f"/api/effectiveness?start=2017&end=2024{filters}",
+    ]
+
+
+def predict_request(state: dict, rng: random.Random) -> str:
+    metric = rng.choice(["all"] + METRICS)
+    method = rng.choice(PREDICT_METHODS)
+    path = f"/api/predict?metric={metric}&horizon=5&method={method}"
+    if state["tipe"] != "all":
+        path += f"&tipe={state['tipe']}"
+    return path
+
+
+def change_filter(state: dict, kabkota_codes: list[int], rng: random.Random) -> None:
+    field = rng.choice(["year", "metric", "tipe", "kabkota"])
+    if field == "year":
+        state["year"] = rng.choice(YEARS)
+    elif field == "metric":
+        state["metric"] = rng.choice(METRICS)
+    elif field == "tipe":
+        state["tipe"] = rng.choice(TIPES)
+    elif kabkota_codes:
+        state["kabkota"] = None if state["kabkota"] else str(rng.choice(kabkota_codes))
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.bursts: list[float] = []
+
+    async def get(self, client: httpx.AsyncClient, path: str) -> None:
+        route = path.split("?", 1)[0]
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        self.statuses[route][status] += 1
+        if status == 0 or status >= 400:
+            self.errors[route] += 1
+
+
+async def run_user(
+    user_id: int,
+    base_url: str,
+    recorder: Recorder,
+    deadline: float,
+    think_time: float,
+    predict_ratio: float,
+    seed: int,
+) -> None:
+    rng = random.Random(seed + user_id)
+    limits = httpx.Limits(max_connections=CONNECTIONS_PER_USER)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        kabkota_codes: list[int] = []
+        try:
+            response = await client.get("/api/kabkota?year=2024&metric=kemiskinan")
+            kabkota_codes = [row["kode_kabupaten_kota"] for row in response.json().get("data", [])]
+        except (httpx.HTTPError, ValueError):
+            pass
+
+        state = {"year": 2024, "metric": "kemiskinan", "tipe": "all", "kabkota": None}
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await asyncio.gather(*(recorder.get(client, path) for path in dashboard_burst(state)))
+            recorder.bursts.append((time.perf_counter() - started) * 1000)
+
+            if rng.random() < predict_ratio:
+                await recorder.get(client, predict_request(state, rng))
+
+            await asyncio.sleep(rng.expovariate(1.0 / think_time) if think_time > 0 else 0)
+            change_filter(state, kabkota_codes, rng)
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    array = np.asarray(values)
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(array.mean()), 2),
+        "max_ms": round(float(array.max()), 2),
+    }
+
+
+def build_report(recorder: Recorder, elapsed: float, config: dict) -> dict:
+    routes = {}
+    for route in sorted(recorder.latencies):
+        count = len(recorder.latencies[route])
+        routes[route] = {
+            "requests": count,
+            "errors": recorder.errors[route],
+            "error_rate": round(recorder.errors[route] / count, 4) if count else 0.0,
+            "statuses": {str(code): n for code, n in sorted(recorder.statuses[route].items())},
+            **_percentiles(recorder.latencies[route]),
+        }
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    errors = sum(recorder.errors.values())
+    return {
+        "config": config,
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "bursts": {"count": len(recorder.bursts), **_percentiles(recorder.bursts)},
+        "routes": routes,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+    )
+
+
+def wait_until_healthy(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"API at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(
+        *(
+            run_user(user, base_url, recorder, deadline, args.think_time, args.predict_ratio, args.seed)
+            for user in range(args.users)
+        )
+    )
+    config = {
+        "base_url": base_url,
+        "users": args.users,
+        "duration_s": args.duration,
+        "think_time_s": args.think_time,
+        "predict_ratio": args.predict_ratio,
+        "workers": None if args.url else args.workers,
+        "seed": args.seed,
+    }
+    return build_report(recorder, time.monotonic() - started, config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target an already running API instead of starting uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the API")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds between filter changes")
+    parser.add_argument("--predict-ratio", type=float, default=0.2, help="chance of a predict call per burst")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{_free_port()}"
+        server = start_server(int(base_url.rsplit(":", 1)[1]), args.workers)
+    try:
+        wait_until_healthy(base_url)
+        report = asyncio.run(run_load(base_url.rstrip("/"), args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
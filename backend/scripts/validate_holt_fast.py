@@ -0,0 +1,111 @@
+"""Validate method=holt_fast against statsmodels' ExponentialSmoothing.
+
+For every kabkota series of every metric, both fits are run on the processed
+tables. The NumPy fit passes when its SSE is no worse than statsmodels' (within
+--rtol). Where both reach the same optimum the forecasts are compared as well.
+statsmodels' optimizer can stop in a local minimum on short series, so a lower
+SSE with different forecasts is expected there.
+
+Usage (from the backend directory):
+    python scripts/validate_holt_fast.py [--horizon 5] [--rtol 1e-3] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.data.analysis.holt import fit_holt_batch, forecast_holt_batch  # noqa: E402
+from app.data.transform import load_processed_tables  # noqa: E402
+
+METRICS = {
+    "pkh": ("fact_pkh", "jumlah_penerima_manfaat"),
+    "kemiskinan": ("fact_kemiskinan_persen", "persentase_penduduk_miskin"),
+    "kemiskinan_abs": ("fact_kemiskinan_abs", "jumlah_penduduk_miskin"),
+}
+
+
+def validate_metric(df, value_col: str, horizon: int, rtol: float) -> dict:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    matrix = (
+        df.pivot_table(index="kode_kabupaten_kota", columns="tahun", values=value_col)
+        .dropna()
+        .to_numpy(dtype=float)
+    )
+    matrix = matrix[np.ptp(matrix, axis=1) > 0]
+
+    started = time.perf_counter()
+    fit = fit_holt_batch(matrix)
+    fast_forecast = forecast_holt_batch(fit, horizon)["values"]
+    fast_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sm_sse = []
+    sm_forecast = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row in matrix:
+            sm_fit = ExponentialSmoothing(row, trend="add", initialization_method="estimated").fit(optimized=True)
+            sm_sse.append(sm_fit.sse)
+            sm_forecast.append(sm_fit.forecast(horizon))
+    sm_seconds = time.perf_counter() - started
+
+    sm_sse = np.array(sm_sse)
+    sm_forecast = np.array(sm_forecast)
+    sse_ratio = fit["sse"] / np.maximum(sm_sse, 1e-12)
+    same_optimum = np.abs(sse_ratio - 1) <= rtol
+    forecast_diff = np.abs(fast_forecast - sm_forecast) / np.maximum(np.abs(sm_forecast), 1e-12)
+
+    return {
+        "series": int(len(matrix)),
+        "fast_seconds": round(fast_seconds, 4),
+        "statsmodels_seconds": round(sm_seconds, 4),
+        "sse_not_worse": int(np.sum(sse_ratio <= 1 + rtol)),
+        "sse_lower": int(np.sum(sse_ratio < 1 - rtol)),
+        "same_optimum": int(same_optimum.sum()),
+        "max_forecast_rel_diff_same_optimum": (
+            float(forecast_diff[same_optimum].max()) if same_optimum.any() else None
+        ),
+        "passed": bool(np.all(sse_ratio <= 1 + rtol)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--rtol", type=float, default=1e-3)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    tables = load_processed_tables()
+    report = {
+        metric: validate_metric(tables[table], value_col, args.horizon, args.rtol)
+        for metric, (table, value_col) in METRICS.items()
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for metric, row in report.items():
+            print(
+                f"{metric:15s} series={row['series']:3d} "
+                f"not_worse={row['sse_not_worse']:3d} lower={row['sse_lower']:3d} "
+                f"same_optimum={row['same_optimum']:3d} "
+                f"max_fc_diff={row['max_forecast_rel_diff_same_optimum']} "
+                f"fast={row['fast_seconds']}s statsmodels={row['statsmodels_seconds']}s "
+                f"{'ok' if row['passed'] else 'FAIL'}"
+            )
+
+    if not all(row["passed"] for row in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()